@@ -4,10 +4,12 @@ Flask API Backend for Multi-Agent Tourism Dashboard
 Connects the web interface to the multi-agent system
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import sys
 import os
+import hashlib
+import json
 import time
 
 # Add src directory to path
@@ -15,28 +17,78 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from agents.tools import TourismTools
 from agents.orchestrator import TourismOrchestrator
+from agents.test_runner import (
+    DEFAULT_PARALLELISM, MODES, TEST_QUERIES, get_fixture_orchestrator, run_test_cases
+)
+from services.transport import transport_stats
+from web.admission import AdmissionController, trust_proxies
+from web.http_cache import ResponseCompressor, set_cache_control
+from web.jobs import JobQueue
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for dashboard
 
+# Client addresses come from X-Forwarded-For only behind TRUSTED_PROXIES proxies
+trust_proxies(app)
+
+# Bound concurrent work on slow LLM/Overpass calls and shed excess load
+admission = AdmissionController.from_env()
+
+# gzip/brotli bodies, ETags and 304s for GET responses
+ResponseCompressor(app)
+DASHBOARD_MAX_AGE = int(os.getenv('DASHBOARD_MAX_AGE', '300'))
+
+# `python app.py` runs the debug server by default; `flask --debug run` sets FLASK_DEBUG
+DEBUG = os.getenv('FLASK_DEBUG', '1' if __name__ == '__main__' else '0').lower() in ('1', 'true', 'yes')
+
+# SSE streams end after this long; EventSource reconnects after JOB_EVENTS_RETRY_MS
+JOB_EVENTS_MAX_SECONDS = float(os.getenv('JOB_EVENTS_MAX_SECONDS', '120'))
+JOB_EVENTS_RETRY_MS = int(os.getenv('JOB_EVENTS_RETRY_MS', '3000'))
+
 # Initialize agents (global to avoid recreation on each request)
 tools_factory = TourismTools()
 tools = tools_factory.create_tools()
 orchestrator = None
 
 try:
-    orchestrator = TourismOrchestrator(tools, verbose=False)
+    orchestrator = TourismOrchestrator(
+        tools,
+        verbose=False,
+        cache=tools_factory.cache,
+        negative_filter=tools_factory.negative_filter
+    )
     print("✓ Multi-agent system initialized successfully")
 except Exception as e:
     print(f"✗ Error initializing agents: {e}")
     print("Make sure OPENAI_API_KEY is set in .env file")
 
 
+def run_job(query):
+    """Run a queued query in a background worker"""
+    start_time = time.time()
+    result = orchestrator.process_query(query)
+    if not result['success']:
+        raise RuntimeError(result.get('error', result['output']))
+    return {
+        'response': result['output'],
+        'response_time': int((time.time() - start_time) * 1000)
+    }
+
+
+# Long-running queries go through a persistent background queue. The debug
+# reloader imports this module in a watcher parent and a serving child
+# (WERKZEUG_RUN_MAIN=true); only the process that serves requests runs workers.
+job_queue = JobQueue.from_env(run_job)
+if orchestrator is not None and (os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not DEBUG):
+    job_queue.start()
+
+
 @app.route('/')
 def index():
     """Serve the dashboard"""
-    return send_from_directory('.', 'dashboard_connected.html')
+    response = send_from_directory('.', 'dashboard_connected.html')
+    return set_cache_control(response, DASHBOARD_MAX_AGE, public=True)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -73,13 +125,22 @@ def get_demo_response(query):
         return f"Demo response for: {query}\n\n[Note: Add OpenAI credits for full AI-powered responses]"
 
 
-@app.route('/api/query', methods=['POST'])
+@app.route('/api/query', methods=['GET', 'POST'])
+@admission.limit
 def process_query():
-    """Process tourism query through multi-agent system"""
+    """
+    Process tourism query through multi-agent system.
+
+    POST takes {"query": ...}. GET takes ?q=... and is cacheable: clients
+    reuse the answer for its max-age and then revalidate with If-None-Match.
+    """
     try:
         # Get query from request
-        data = request.get_json()
-        query = data.get('query', '').strip()
+        if request.method == 'GET':
+            query = request.args.get('q', '').strip()
+        else:
+            data = request.get_json()
+            query = data.get('query', '').strip()
         
         if not query:
             return jsonify({
@@ -102,24 +163,32 @@ def process_query():
             end_time = time.time()
             response_time = int((end_time - start_time) * 1000)
             
-            return jsonify({
+            response = jsonify({
                 'success': result['success'],
                 'response': result['output'],
                 'response_time': response_time,
                 'query': query
             })
+            if request.method == 'GET':
+                # Validator over the answer itself, so a recomputed (or re-cached)
+                # identical answer still revalidates despite a new response_time
+                answer = json.dumps([query, result['success'], result['output']])
+                response.set_etag(hashlib.sha256(answer.encode('utf-8')).hexdigest())
+            # Answers are per-user and embed live weather, so only the client may reuse them
+            return set_cache_control(response, result.get('max_age', 0))
         except Exception as e:
             # If OpenAI quota exceeded, return demo response
             error_str = str(e)
             if '429' in error_str or 'quota' in error_str.lower() or 'insufficient_quota' in error_str:
                 demo_response = get_demo_response(query)
                 end_time = time.time()
-                return jsonify({
+                response = jsonify({
                     'success': True,
                     'response': demo_response + '\n\n🎭 [Demo Mode: OpenAI quota exceeded - showing sample response]',
                     'response_time': int((end_time - start_time) * 1000),
                     'query': query
                 })
+                return set_cache_control(response, 0)
             # Re-raise other errors
             raise
             
@@ -131,40 +200,165 @@ def process_query():
 
 
 @app.route('/api/test', methods=['GET'])
+@admission.limit
 def run_tests():
-    """Run all test cases from assignment"""
-    test_queries = [
-        "I'm going to go to Bangalore, let's plan my trip.",
-        "I'm going to go to Bangalore, what is the temperature there",
-        "I'm going to go to Bangalore, what is the temperature there? And what are the places I can visit?",
-        "I'm going to InvalidCity123"
-    ]
+    """
+    Run all test cases from assignment concurrently.
     
-    results = []
+    Query params:
+        parallelism: Cases run at once (default: TEST_PARALLELISM or 4), capped
+            by free admission slots so test runs count against the same limit
+        mode: 'live' (shared orchestrator) or 'replay' (fixture file).
+            Recording overwrites fixtures, so it's only available from the CLI.
+    """
+    mode = request.args.get('mode', 'live')
+    parallelism = request.args.get('parallelism', DEFAULT_PARALLELISM, type=int)
     
-    for query in test_queries:
-        try:
-            start_time = time.time()
-            result = orchestrator.process_query(query)
-            end_time = time.time()
-            
-            results.append({
-                'query': query,
-                'success': result['success'],
-                'response': result['output'],
-                'response_time': int((end_time - start_time) * 1000)
-            })
-        except Exception as e:
-            results.append({
-                'query': query,
-                'success': False,
-                'error': str(e)
-            })
+    if mode not in MODES:
+        return jsonify({
+            'success': False,
+            'error': f"mode must be one of: {', '.join(MODES)}"
+        }), 400
+    if mode == 'record':
+        return jsonify({
+            'success': False,
+            'error': "Record mode is only available from the CLI: python main.py test --record"
+        }), 403
     
-    return jsonify({
+    try:
+        runner = orchestrator if mode == 'live' else get_fixture_orchestrator(mode)
+    except FileNotFoundError as e:
+        # Nothing recorded yet: the caller has to record first, the server isn't at fault
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 409
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    if runner is None:
+        return jsonify({
+            'success': False,
+            'error': 'Agent system not initialized. Check OPENAI_API_KEY in .env'
+        }), 500
+    
+    start_time = time.time()
+    # This request already holds one admission slot; extra cases need their own
+    with admission.extra_slots(max(0, parallelism - 1)) as extra:
+        parallelism = 1 + extra
+        results = run_test_cases(runner, TEST_QUERIES, parallelism)
+    
+    response = jsonify({
         'success': True,
+        'mode': mode,
+        'parallelism': parallelism,
+        'total_time': int((time.time() - start_time) * 1000),
         'tests': results
     })
+    return set_cache_control(response, 0)
+
+
+@app.route('/api/jobs', methods=['POST'])
+@admission.limit_rate
+def create_job():
+    """Queue a query and return its job id immediately"""
+    data = request.get_json(silent=True) or {}
+    query = data.get('query', '').strip()
+    
+    if not query:
+        return jsonify({
+            'success': False,
+            'error': 'Query cannot be empty'
+        }), 400
+    
+    if orchestrator is None:
+        return jsonify({
+            'success': False,
+            'error': 'Agent system not initialized. Check OPENAI_API_KEY in .env'
+        }), 500
+    
+    job_id = job_queue.submit(query)
+    if job_id is None:
+        response = jsonify({
+            'success': False,
+            'error': 'Too many pending jobs, please retry shortly'
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = '30'
+        return response
+    
+    response = jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/jobs/{job_id}',
+        'events_url': f'/api/jobs/{job_id}/events'
+    })
+    response.status_code = 202
+    response.headers['Location'] = f'/api/jobs/{job_id}'
+    return response
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status and, once finished, its result"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    response = jsonify({'success': True, **job})
+    if job['status'] in ('queued', 'running'):
+        # Pollers revalidate with If-None-Match and get 304 until the job changes
+        response.cache_control.no_cache = True
+        return response
+    return set_cache_control(response, 3600)
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+@admission.limit_stream
+def job_events(job_id):
+    """
+    Stream a job's status changes as Server-Sent Events until it finishes.
+    Each stream pins a thread, so open streams are capped (MAX_STREAMS,
+    MAX_STREAMS_PER_CLIENT) and closed after JOB_EVENTS_MAX_SECONDS;
+    EventSource reconnects and resumes on its own.
+    """
+    if job_queue.get(job_id) is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    def stream():
+        last_status = None
+        last_sent = started = time.time()
+        yield f"retry: {JOB_EVENTS_RETRY_MS}\n\n"
+        while time.time() - started < JOB_EVENTS_MAX_SECONDS:
+            job = job_queue.get(job_id)
+            if job is None:
+                return
+            if job['status'] != last_status:
+                last_status = job['status']
+                last_sent = time.time()
+                yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+                if job['status'] not in ('queued', 'running'):
+                    return
+            elif time.time() - last_sent > 15:
+                # Comment line keeps proxies from closing an idle stream
+                last_sent = time.time()
+                yield ": keep-alive\n\n"
+            time.sleep(0.5)
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @app.route('/api/stats', methods=['GET'])
@@ -175,7 +369,9 @@ def get_stats():
         'total_queries': 0,
         'success_count': 0,
         'avg_response_time': 0,
-        'active_agents': 3
+        'active_agents': 3,
+        'admission': admission.stats(),
+        'transport': transport_stats.snapshot()
     })
 
 
@@ -188,4 +384,4 @@ if __name__ == '__main__':
     print("API Docs: http://localhost:5000/api/health")
     print("\nPress Ctrl+C to stop\n")
     
-    app.run(debug=True, port=5000, host='0.0.0.0')
+    app.run(debug=DEBUG, port=5000, host='0.0.0.0')
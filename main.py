@@ -6,6 +6,7 @@ Run this file to start the interactive tourism assistant.
 
 import os
 import sys
+import time
 from dotenv import load_dotenv
 
 # Add src directory to path
@@ -13,35 +14,51 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from agents.tools import TourismTools
 from agents.orchestrator import TourismOrchestrator
+from agents.test_runner import (
+    DEFAULT_PARALLELISM, TEST_QUERIES, build_fixture_orchestrator, run_test_cases
+)
 
 
-def run_tests():
-    """Run test cases from the assignment"""
+def run_tests(mode: str = "live", parallelism: int = DEFAULT_PARALLELISM):
+    """Run test cases from the assignment concurrently"""
     print("="*60)
-    print("RUNNING ASSIGNMENT TEST CASES")
+    print(f"RUNNING ASSIGNMENT TEST CASES ({mode}, parallelism {parallelism})")
     print("="*60)
     
-    test_queries = [
-        "I'm going to go to Bangalore, let's plan my trip.",
-        "I'm going to go to Bangalore, what is the temperature there",
-        "I'm going to go to Bangalore, what is the temperature there? And what are the places I can visit?",
-        "I'm going to InvalidCity123"
-    ]
-    
     # Create tools and orchestrator
-    tools_factory = TourismTools()
-    tools = tools_factory.create_tools()
-    orchestrator = TourismOrchestrator(tools, verbose=False)
+    if mode == "live":
+        tools_factory = TourismTools()
+        tools = tools_factory.create_tools()
+        orchestrator = TourismOrchestrator(
+            tools,
+            verbose=False,
+            cache=tools_factory.cache,
+            negative_filter=tools_factory.negative_filter
+        )
+    else:
+        orchestrator = build_fixture_orchestrator(mode)
+    
+    start_time = time.time()
+    results = run_test_cases(orchestrator, TEST_QUERIES, parallelism)
+    total_time = int((time.time() - start_time) * 1000)
     
-    for i, query in enumerate(test_queries, 1):
+    for i, result in enumerate(results, 1):
         print(f"\n{'='*60}")
         print(f"Test Case {i}")
         print(f"{'='*60}")
-        print(f"User: {query}\n")
+        print(f"User: {result['query']}\n")
         
-        result = orchestrator.process_query(query)
-        print(f"Assistant: {result['output']}")
+        print(f"Assistant: {result.get('response', result.get('error'))}")
         print(f"Status: {'✓ Success' if result['success'] else '✗ Failed'}")
+        
+        timings = result['timings']
+        print(
+            f"Time: {result['response_time']}ms "
+            f"(LLM {timings.get('llm_ms', 0)}ms, tools {timings.get('tool_ms', 0)}ms, "
+            f"HTTP {timings.get('http_ms', 0)}ms, cache hits {timings.get('cache_hits', 0)})"
+        )
+    
+    print(f"\nTotal: {total_time}ms")
 
 
 def run_interactive():
@@ -49,7 +66,12 @@ def run_interactive():
     # Create tools and orchestrator
     tools_factory = TourismTools()
     tools = tools_factory.create_tools()
-    orchestrator = TourismOrchestrator(tools, verbose=True)
+    orchestrator = TourismOrchestrator(
+        tools,
+        verbose=True,
+        cache=tools_factory.cache,
+        negative_filter=tools_factory.negative_filter
+    )
     
     # Start chat
     orchestrator.chat()
@@ -60,8 +82,10 @@ def main():
     # Load environment variables
     load_dotenv()
     
-    # Check for API key
-    if not os.getenv("OPENAI_API_KEY"):
+    args = sys.argv[1:]
+    
+    # Check for API key (replayed test runs don't call OpenAI)
+    if not os.getenv("OPENAI_API_KEY") and "--replay" not in args:
         print("="*60)
         print("ERROR: OPENAI_API_KEY not found!")
         print("="*60)
@@ -72,15 +96,22 @@ def main():
         sys.exit(1)
     
     # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "test":
-            run_tests()
+    if args:
+        if args[0] == "test":
+            mode = "replay" if "--replay" in args else "record" if "--record" in args else "live"
+            parallelism = DEFAULT_PARALLELISM
+            if "--parallel" in args and args.index("--parallel") + 1 < len(args):
+                parallelism = int(args[args.index("--parallel") + 1])
+            run_tests(mode, parallelism)
             return
-        elif sys.argv[1] == "help":
+        elif args[0] == "help":
             print("Usage:")
-            print("  python main.py         - Run interactive chat mode")
-            print("  python main.py test    - Run assignment test cases")
-            print("  python main.py help    - Show this help message")
+            print("  python main.py                    - Run interactive chat mode")
+            print("  python main.py test               - Run assignment test cases")
+            print("  python main.py test --parallel N  - Run N test cases at once (default: 4)")
+            print("  python main.py test --record      - Run tests and record traffic to fixtures")
+            print("  python main.py test --replay      - Run tests offline against recorded fixtures")
+            print("  python main.py help               - Show this help message")
             return
     
     # Default: run interactive mode
@@ -6,33 +6,122 @@ Uses LangChain ReAct agent to coordinate child agents.
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-from typing import Dict, Optional
+from langchain_core.caches import BaseCache
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.load import dumps, loads
+from typing import Dict, Optional, TYPE_CHECKING
+import hashlib
 import os
+import sys
+import time
 from dotenv import load_dotenv
 
+# Add src directory to path for service imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import metrics
+
+if TYPE_CHECKING:
+    from services.cache import Cache
+    from services.negative_filter import NegativeLookupFilter
+
 # Load environment variables
 load_dotenv()
 
 
+class LLMCache(BaseCache):
+    """Adapts a Cache view to LangChain's LLM cache interface"""
+    
+    def __init__(self, cache: "Cache"):
+        self.cache = cache
+    
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+    
+    def lookup(self, prompt: str, llm_string: str):
+        cached = self.cache.get(self._key(prompt, llm_string))
+        if cached is None:
+            return None
+        return [loads(generation) for generation in cached]
+    
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        # Store JSON strings so any serializer (pickle or msgpack) can handle them
+        self.cache.set(
+            self._key(prompt, llm_string),
+            [dumps(generation) for generation in return_val]
+        )
+    
+    def clear(self, **kwargs) -> None:
+        self.cache.clear()
+
+
+class LLMTimingCallback(BaseCallbackHandler):
+    """Attributes LLM call time to the current request's metrics"""
+    
+    def __init__(self):
+        self._starts = {}
+    
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+    
+    def _finish(self, run_id):
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            metrics.record_time("llm", time.perf_counter() - start)
+            metrics.incr("llm_calls")
+    
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id)
+    
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+
 class TourismOrchestrator:
     """
     Parent Agent that orchestrates Weather and Places child agents.
     Uses LangChain's ReAct pattern for reasoning and acting.
     """
     
-    def __init__(self, tools: list, verbose: bool = True):
+    ANSWER_CACHE_TTL = 10 * 60  # Answers embed current weather
+    UNKNOWN_PLACE_ANSWER = "I don't know this place exists"
+    # Returned by AgentExecutor when it gives up instead of reaching a Final Answer
+    STOPPED_ANSWER_PREFIX = "Agent stopped due to"
+    # Tool observations reporting a failed upstream call rather than data
+    TOOL_FAILURE_PREFIXES = ("Could not retrieve", "No tourist attractions found")
+    
+    def __init__(
+        self,
+        tools: list,
+        verbose: bool = True,
+        cache: Optional["Cache"] = None,
+        negative_filter: Optional["NegativeLookupFilter"] = None,
+        llm_cache: Optional["Cache"] = None,
+        api_key: Optional[str] = None
+    ):
         """
         Initialize the orchestrator agent.
         
         Args:
             tools: List of LangChain tools (WeatherAgent, PlacesAgent)
             verbose: Whether to print agent's reasoning process
+            cache: Optional root cache for final answers and LLM calls
+            negative_filter: Optional filter shared with GeocodingService;
+                queries about known-nonexistent places skip the LLM entirely
+            llm_cache: Optional cache view for LLM generations
+                (default: the 'llm' namespace of cache)
+            api_key: OpenAI key (default: OPENAI_API_KEY)
         """
         self.tools = tools
         self.verbose = verbose
+        self.negative_filter = negative_filter
+        self.answer_cache = cache.namespace("answers", self.ANSWER_CACHE_TTL) if cache is not None else None
+        if llm_cache is None and cache is not None:
+            llm_cache = cache.namespace("llm")
+        self._timing_callback = LLMTimingCallback()
         
         # Initialize LLM
-        api_key = os.getenv("OPENAI_API_KEY")
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError(
                 "OPENAI_API_KEY not found. Please set it in .env file or environment variables."
@@ -41,7 +130,8 @@ class TourismOrchestrator:
         self.llm = ChatOpenAI(
             temperature=0,  # Deterministic responses
             model=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
-            openai_api_key=api_key
+            openai_api_key=api_key,
+            cache=LLMCache(llm_cache) if llm_cache is not None else None
         )
         
         # Create agent
@@ -51,7 +141,10 @@ class TourismOrchestrator:
             tools=self.tools,
             verbose=self.verbose,
             handle_parsing_errors=True,
-            max_iterations=5
+            max_iterations=5,
+            return_intermediate_steps=True,
+            # Streamed LLM calls bypass LangChain's LLM cache; the agent only needs the full text
+            stream_runnable=False
         )
     
     def _create_agent(self):
@@ -98,13 +191,44 @@ Thought: {agent_scratchpad}"""
             user_query: The user's input query
             
         Returns:
-            Dict with 'output' (response) and 'success' (bool)
+            Dict with 'output' (response), 'success' (bool) and 'max_age'
+            (seconds the answer stays fresh; 0 when it shouldn't be reused)
         """
+        cache_key = " ".join(user_query.lower().split())
+        if self.negative_filter is not None and self.negative_filter.contains(f"query:{cache_key}"):
+            return {
+                "output": self.UNKNOWN_PLACE_ANSWER,
+                "success": True,
+                "max_age": self.ANSWER_CACHE_TTL
+            }
+        
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get(cache_key)
+            if isinstance(cached, dict):
+                return {
+                    "output": cached["output"],
+                    "success": True,
+                    "max_age": max(0, int(cached["expires_at"] - time.time()))
+                }
+        
         try:
-            result = self.agent_executor.invoke({"input": user_query})
+            result = self.agent_executor.invoke(
+                {"input": user_query},
+                config={"callbacks": [self._timing_callback]}
+            )
+            max_age = 0
+            if self.answer_cache is not None and self._is_cacheable(result):
+                self.answer_cache.set(cache_key, {
+                    "output": result["output"],
+                    "expires_at": time.time() + self.ANSWER_CACHE_TTL
+                })
+                max_age = self.ANSWER_CACHE_TTL
+            if self._is_unknown_place(result):
+                self.negative_filter.add(f"query:{cache_key}")
             return {
                 "output": result["output"],
-                "success": True
+                "success": True,
+                "max_age": max_age
             }
         except Exception as e:
             error_msg = f"Error processing query: {str(e)}"
@@ -112,9 +236,54 @@ Thought: {agent_scratchpad}"""
             return {
                 "output": "Sorry, I encountered an error processing your request.",
                 "success": False,
+                "max_age": 0,
                 "error": str(e)
             }
     
+    def _is_cacheable(self, result: Dict) -> bool:
+        """
+        Whether the agent reached a real Final Answer built only on
+        successful tool calls. Answers from a stopped agent, a parsing
+        retry or a failed upstream lookup must not be reused.
+        """
+        output = result["output"].strip()
+        steps = result.get("intermediate_steps", [])
+        if not output or output.startswith(self.STOPPED_ANSWER_PREFIX):
+            return False
+        if len(steps) >= self.agent_executor.max_iterations:
+            return False
+
+        tool_names = {tool.name for tool in self.tools}
+        for action, observation in steps:
+            # '_Exception' steps are parsing errors fed back to the LLM; others are invalid tools
+            if action.tool not in tool_names or not isinstance(observation, str):
+                return False
+            if observation.startswith(self.TOOL_FAILURE_PREFIXES):
+                return False
+            # A geocoding miss is only definitive once the negative filter recorded it
+            if observation.startswith(self.UNKNOWN_PLACE_ANSWER) and not (
+                self.negative_filter is not None
+                and isinstance(action.tool_input, str)
+                and self.negative_filter.contains(action.tool_input)
+            ):
+                return False
+        return True
+    
+    def _is_unknown_place(self, result: Dict) -> bool:
+        """
+        Whether the agent concluded the place doesn't exist and every place
+        it looked up was a definitive geocoding miss (not a network error).
+        """
+        if self.negative_filter is None:
+            return False
+        if not result["output"].strip().startswith(self.UNKNOWN_PLACE_ANSWER):
+            return False
+        steps = result.get("intermediate_steps", [])
+        return bool(steps) and all(
+            isinstance(action.tool_input, str) and self.negative_filter.contains(action.tool_input)
+            for action, _ in steps
+        )
+    
     def chat(self):
         """Interactive chat loop for testing"""
         print("="*60)
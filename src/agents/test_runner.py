@@ -0,0 +1,152 @@
+"""
+Assignment Test Runner
+Runs the assignment queries concurrently and reports a per-case timing
+breakdown. Can record upstream HTTP and LLM traffic to a fixture file and
+replay it later for fast, offline smoke checks.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+
+# Add src directory to path for service imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import metrics
+from services.cache import Cache, SQLiteBackend, create_cache
+from services.transport import create_session
+from agents.tools import TourismTools
+from agents.orchestrator import TourismOrchestrator
+
+
+TEST_QUERIES = [
+    "I'm going to go to Bangalore, let's plan my trip.",
+    "I'm going to go to Bangalore, what is the temperature there",
+    "I'm going to go to Bangalore, what is the temperature there? And what are the places I can visit?",
+    "I'm going to InvalidCity123"
+]
+
+MODES = ("live", "record", "replay")
+DEFAULT_FIXTURES = os.getenv("TEST_FIXTURES", os.path.join("fixtures", "test_cases.sqlite3"))
+DEFAULT_PARALLELISM = int(os.getenv("TEST_PARALLELISM", "4"))
+
+
+def run_case(orchestrator: TourismOrchestrator, query: str) -> Dict:
+    """
+    Run one query and collect its timing breakdown.
+
+    Returns:
+        Dict with 'query', 'success', 'response' (or 'error'),
+        'response_time' in ms and 'timings' (llm/tool/http ms, cache hits, ...)
+    """
+    with metrics.collect() as collected:
+        start = time.perf_counter()
+        try:
+            result = orchestrator.process_query(query)
+            case = {
+                'query': query,
+                'success': result['success'],
+                'response': result['output']
+            }
+        except Exception as e:
+            case = {
+                'query': query,
+                'success': False,
+                'error': str(e)
+            }
+        case['response_time'] = int((time.perf_counter() - start) * 1000)
+    case['timings'] = collected.as_dict()
+    return case
+
+
+def run_test_cases(
+    orchestrator: TourismOrchestrator,
+    queries: Optional[List[str]] = None,
+    parallelism: int = DEFAULT_PARALLELISM
+) -> List[Dict]:
+    """
+    Run queries concurrently against one orchestrator.
+
+    Args:
+        orchestrator: Orchestrator to run the queries through
+        queries: Queries to run (default: TEST_QUERIES)
+        parallelism: Cases run at once (1 runs them sequentially)
+
+    Returns:
+        Per-case results in the same order as queries
+    """
+    queries = queries or TEST_QUERIES
+    workers = max(1, min(parallelism, len(queries)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="test-case") as pool:
+        return list(pool.map(partial(run_case, orchestrator), queries))
+
+
+def build_fixture_orchestrator(
+    mode: str,
+    fixtures_path: str = DEFAULT_FIXTURES,
+    verbose: bool = False
+) -> TourismOrchestrator:
+    """
+    Build an orchestrator whose HTTP and LLM traffic is recorded to or
+    replayed from a fixture file.
+
+    Fixture runs start from an empty in-memory cache and no negative filter,
+    so every upstream call is exercised (and therefore recorded).
+
+    Args:
+        mode: 'record' or 'replay'
+        fixtures_path: SQLite file holding recorded traffic
+        verbose: Whether to print the agent's reasoning process
+    """
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Fixture mode must be 'record' or 'replay', not '{mode}'")
+    if mode == "replay" and not os.path.exists(fixtures_path):
+        raise FileNotFoundError(
+            f"No recorded fixtures at '{fixtures_path}'. Run `python main.py test --record` first."
+        )
+
+    fixtures_dir = os.path.dirname(fixtures_path)
+    if fixtures_dir:
+        os.makedirs(fixtures_dir, exist_ok=True)
+    # Recorded traffic isn't a cache, so reading it mustn't show up as cache hits
+    fixtures = Cache(SQLiteBackend(fixtures_path), namespace="fixtures:", track_metrics=False)
+
+    tools_factory = TourismTools(
+        cache=create_cache("memory"),
+        session_factory=partial(create_session, fixtures=fixtures.namespace("http"), fixture_mode=mode),
+        negative_filter=None
+    )
+    if mode == "replay":
+        # Recorded responses don't need Nominatim's request spacing
+        tools_factory.geocoding.min_interval = 0
+
+    return TourismOrchestrator(
+        tools_factory.create_tools(),
+        verbose=verbose,
+        cache=tools_factory.cache,
+        llm_cache=fixtures.namespace("llm"),
+        # Replayed LLM calls never reach OpenAI, so a key is only needed to record
+        api_key=os.getenv("OPENAI_API_KEY") or ("replay" if mode == "replay" else None)
+    )
+
+
+_fixture_orchestrators: Dict[Tuple[str, str], TourismOrchestrator] = {}
+_fixture_lock = threading.Lock()
+
+
+def get_fixture_orchestrator(mode: str, fixtures_path: str = DEFAULT_FIXTURES) -> TourismOrchestrator:
+    """
+    Shared fixture orchestrator for a mode and fixture file, built on first use.
+    Long-running callers (the web API) use this so repeated runs reuse one
+    set of sessions, caches and fixture connections.
+    """
+    key = (mode, os.path.abspath(fixtures_path))
+    with _fixture_lock:
+        orchestrator = _fixture_orchestrators.get(key)
+        if orchestrator is None:
+            orchestrator = _fixture_orchestrators[key] = build_fixture_orchestrator(mode, fixtures_path)
+        return orchestrator
@@ -4,7 +4,8 @@ Wraps API services as LangChain tools for agent use.
 """
 
 from langchain.tools import Tool
-from typing import Dict
+from typing import Callable, Dict, Optional
+from functools import wraps
 import sys
 import os
 
@@ -14,16 +15,50 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 from services.tourism import TourismService
 from services.weather import WeatherService
 from services.geocoding import GeocodingService
+from services.cache import Cache, create_cache
+from services.gazetteer import Gazetteer
+from services.negative_filter import NegativeLookupFilter
+from services.transport import create_session
+from services import metrics
 
 
+_FROM_ENV = object()
+
 
 class TourismTools:
     """Factory class for creating LangChain tools"""
     
-    def __init__(self):
-        self.geocoding = GeocodingService()
-        self.weather = WeatherService()
-        self.tourism = TourismService()
+    def __init__(
+        self,
+        cache: Optional[Cache] = None,
+        session_factory: Callable = create_session,
+        negative_filter=_FROM_ENV
+    ):
+        """
+        Args:
+            cache: Shared root cache (default: built from CACHE_* env vars)
+            session_factory: Builds the HTTP session for each API from its base URL
+            negative_filter: NegativeLookupFilter to share, or None for no filter
+                (default: built from NEGATIVE_FILTER_* env vars)
+        """
+        self.cache = cache if cache is not None else create_cache()
+        if negative_filter is _FROM_ENV:
+            negative_filter = NegativeLookupFilter.from_env()
+        self.negative_filter = negative_filter
+        self.geocoding = GeocodingService(
+            cache=self.cache.namespace("geocoding"),
+            gazetteer=Gazetteer.from_env(),
+            negative_filter=self.negative_filter,
+            session=session_factory(GeocodingService.BASE_URL)
+        )
+        self.weather = WeatherService(
+            cache=self.cache.namespace("weather"),
+            session=session_factory(WeatherService.BASE_URL)
+        )
+        self.tourism = TourismService(
+            cache=self.cache.namespace("attractions"),
+            session=session_factory(TourismService.BASE_URL)
+        )
     
     def _weather_agent_function(self, place_name: str) -> str:
         """
@@ -77,12 +112,21 @@ class TourismTools:
         
         return formatted
     
+    @staticmethod
+    def _timed(func):
+        """Attribute a tool's wall time to the current request's metrics"""
+        @wraps(func)
+        def wrapper(place_name: str) -> str:
+            with metrics.timed("tool"):
+                return func(place_name)
+        return wrapper
+    
     def create_tools(self):
         """Create and return LangChain tools for the agents"""
         
         weather_tool = Tool(
             name="WeatherAgent",
-            func=self._weather_agent_function,
+            func=self._timed(self._weather_agent_function),
             description=(
                 "Useful for getting current weather information for a location. "
                 "Input should be a place name (e.g., 'Bangalore', 'Paris'). "
@@ -92,7 +136,7 @@ class TourismTools:
         
         places_tool = Tool(
             name="PlacesAgent",
-            func=self._places_agent_function,
+            func=self._timed(self._places_agent_function),
             description=(
                 "Useful for getting tourist attractions and places to visit in a location. "
                 "Input should be a place name (e.g., 'Bangalore', 'Paris'). "
@@ -0,0 +1,447 @@
+"""
+Cache Service - Pluggable Cache Backends
+Shared caching layer for geocoding, weather, attractions, answers and LLM calls.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    from services import metrics
+except ImportError:  # Run as a script from src/services
+    import metrics
+
+
+# ---------------------------------------------------------------------------
+# Serializers
+# ---------------------------------------------------------------------------
+
+class PickleSerializer:
+    """Serializes arbitrary Python objects with pickle"""
+
+    name = "pickle"
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class MsgpackSerializer:
+    """Serializes plain data (dicts, lists, strings, numbers) with msgpack"""
+
+    name = "msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError(
+                "msgpack is not installed. Run 'pip install msgpack' or use the pickle serializer."
+            ) from e
+        self._msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+def get_serializer(name: str = "pickle"):
+    """Return a serializer instance by name ('pickle' or 'msgpack')"""
+    name = (name or "pickle").lower()
+    if name == "pickle":
+        return PickleSerializer()
+    if name == "msgpack":
+        return MsgpackSerializer()
+    raise ValueError(f"Unknown cache serializer: {name}")
+
+
+# ---------------------------------------------------------------------------
+# Backends (store raw bytes keyed by fully-qualified string keys)
+# ---------------------------------------------------------------------------
+
+class MemoryBackend:
+    """
+    In-process LRU store bounded by total payload size.
+    Fast, but private to a single worker process.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 100_000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at)
+            self._size += len(value)
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self, prefix: str = ""):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                self._remove(key)
+
+    def total_size(self) -> int:
+        """Payload bytes currently stored"""
+        with self._lock:
+            return self._size
+
+    def _remove(self, key: str):
+        value, _ = self._data.pop(key)
+        self._size -= len(value)
+
+    def _evict(self):
+        # Drop least recently used entries until we fit the size budget
+        while self._data and (self._size > self.max_bytes or len(self._data) > self.max_entries):
+            key = next(iter(self._data))
+            self._remove(key)
+
+
+class SQLiteBackend:
+    """
+    File-backed store shared by every worker process on the same host.
+    Entries are evicted by last access time once the size budget is exceeded.
+    """
+
+    # Reads refresh accessed_at at most this often, so hot keys don't turn
+    # every lookup into a write that contends for the WAL lock
+    ACCESS_RESOLUTION = 60.0
+
+    def __init__(self, path: str = "cache.sqlite3", max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at);
+            CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at);
+
+            -- Running payload total, kept exact by triggers so eviction never scans the table
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_size INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO cache_meta (id, total_size)
+                SELECT 1, COALESCE(SUM(size), 0) FROM cache;
+            CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache BEGIN
+                UPDATE cache_meta SET total_size = total_size + NEW.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache BEGIN
+                UPDATE cache_meta SET total_size = total_size + NEW.size - OLD.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache BEGIN
+                UPDATE cache_meta SET total_size = total_size - OLD.size WHERE id = 1;
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at is not None and expires_at <= now:
+                # Left for eviction to remove, keeping reads write-free
+                return None
+            if now - accessed_at >= self.ACCESS_RESOLUTION:
+                self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            return bytes(value)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (key, sqlite3.Binary(value), len(value), expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self, prefix: str = ""):
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (pattern,))
+            self._conn.commit()
+
+    def total_size(self) -> int:
+        """Payload bytes currently stored"""
+        with self._lock:
+            return self._total_size()
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT total_size FROM cache_meta WHERE id = 1").fetchone()[0]
+
+    def _evict(self, now: float):
+        if self._total_size() <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        excess = self._total_size() - self.max_bytes
+        if excess <= 0:
+            return
+        # Remove least recently accessed rows until we are back under budget
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", stale)
+
+
+class RedisBackend:
+    """
+    Store speaking the Redis protocol, shared across workers and nodes.
+    Size-aware eviction is delegated to the server's maxmemory policy
+    (e.g. allkeys-lru). Pass a fakeredis client for local testing.
+    """
+
+    def __init__(self, client=None, url: str = "redis://localhost:6379/0"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    "redis is not installed. Run 'pip install redis' or choose another cache backend."
+                ) from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl:
+            self.client.set(key, value, px=int(ttl * 1000))
+        else:
+            self.client.set(key, value)
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+    def clear(self, prefix: str = ""):
+        keys = list(self.client.scan_iter(match=f"{prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+# ---------------------------------------------------------------------------
+# Cache front-end
+# ---------------------------------------------------------------------------
+
+class Cache:
+    """
+    Namespaced cache view over a shared backend.
+    Serializes values, applies default TTLs and never lets backend
+    failures break the caller (errors are logged and treated as misses).
+    """
+
+    def __init__(
+        self,
+        backend,
+        namespace: str = "",
+        serializer=None,
+        default_ttl: Optional[float] = None,
+        track_metrics: bool = True
+    ):
+        """
+        Args:
+            backend: Storage backend (MemoryBackend, SQLiteBackend, RedisBackend)
+            namespace: Key prefix isolating this view from others
+            serializer: Serializer instance (default: pickle)
+            default_ttl: TTL in seconds applied when set() is given none
+            track_metrics: Whether reads count as request cache hits/misses
+                (off for stores that aren't a cache, e.g. test fixtures)
+        """
+        self.backend = backend
+        self.namespace_prefix = namespace
+        self.serializer = serializer or PickleSerializer()
+        self.default_ttl = default_ttl
+        self.track_metrics = track_metrics
+
+    def namespace(self, name: str, default_ttl: Optional[float] = None) -> "Cache":
+        """Return a child view whose keys live under '<namespace>:<name>:'"""
+        prefix = f"{self.namespace_prefix}{name}:"
+        ttl = default_ttl if default_ttl is not None else self.default_ttl
+        return Cache(self.backend, prefix, self.serializer, ttl, self.track_metrics)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace_prefix}{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a value.
+
+        Args:
+            key: Key within this namespace
+            default: Returned on a miss, expiry or backend error
+
+        Returns:
+            The cached value or default
+        """
+        try:
+            data = self.backend.get(self._key(key))
+            if data is None:
+                if self.track_metrics:
+                    metrics.incr("cache_misses")
+                return default
+            if self.track_metrics:
+                metrics.incr("cache_hits")
+            return self.serializer.loads(data)
+        except Exception as e:
+            print(f"Cache read error for '{key}': {e}")
+            return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value.
+
+        Args:
+            key: Key within this namespace
+            value: Any value the serializer can handle
+            ttl: Time-to-live in seconds (default: the namespace TTL)
+        """
+        try:
+            data = self.serializer.dumps(value)
+            self.backend.set(self._key(key), data, ttl if ttl is not None else self.default_ttl)
+        except Exception as e:
+            print(f"Cache write error for '{key}': {e}")
+
+    def delete(self, key: str):
+        """Remove a single key"""
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            print(f"Cache delete error for '{key}': {e}")
+
+    def clear(self):
+        """Remove every key in this namespace"""
+        try:
+            self.backend.clear(self.namespace_prefix)
+        except Exception as e:
+            print(f"Cache clear error: {e}")
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value, computing and storing it on a miss.
+        None results are returned but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = factory()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+
+def create_cache(
+    backend: Optional[str] = None,
+    url: Optional[str] = None,
+    serializer: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    namespace: str = "tourism:"
+) -> Cache:
+    """
+    Build a Cache from arguments, falling back to environment variables.
+
+    Environment:
+        CACHE_BACKEND: 'memory' (default), 'sqlite' or 'redis'
+        CACHE_URL: SQLite file path or Redis URL
+        CACHE_SERIALIZER: 'pickle' (default) or 'msgpack'
+        CACHE_MAX_BYTES: Size budget for memory/sqlite backends
+
+    Returns:
+        Root Cache; call .namespace() to get per-service views
+    """
+    backend = (backend or os.getenv("CACHE_BACKEND", "memory")).lower()
+    url = url or os.getenv("CACHE_URL")
+    serializer = serializer or os.getenv("CACHE_SERIALIZER", "pickle")
+    if max_bytes is None and os.getenv("CACHE_MAX_BYTES"):
+        max_bytes = int(os.getenv("CACHE_MAX_BYTES"))
+
+    if backend == "memory":
+        store = MemoryBackend(max_bytes=max_bytes) if max_bytes else MemoryBackend()
+    elif backend == "sqlite":
+        path = url or "cache.sqlite3"
+        store = SQLiteBackend(path, max_bytes=max_bytes) if max_bytes else SQLiteBackend(path)
+    elif backend == "redis":
+        store = RedisBackend(url=url or "redis://localhost:6379/0")
+    else:
+        raise ValueError(f"Unknown cache backend: {backend}")
+
+    return Cache(store, namespace=namespace, serializer=get_serializer(serializer))
+
+
+# For testing
+if __name__ == "__main__":
+    cache = create_cache()
+    geo = cache.namespace("geocoding", default_ttl=60)
+
+    print("Testing Cache Service...\n")
+    geo.set("bangalore", {"lat": 12.9716, "lon": 77.5946})
+    print(f"✓ Hit: {geo.get('bangalore')}")
+    print(f"✓ Miss: {geo.get('paris')}")
+
+    geo.set("short-lived", "value", ttl=0.1)
+    time.sleep(0.2)
+    print(f"✓ Expired: {geo.get('short-lived')}")
@@ -0,0 +1,366 @@
+"""
+Gazetteer Service - Offline Place Lookup
+Resolves well-known place names locally from a memory-mapped index
+built from a GeoNames-format cities dump.
+"""
+
+import difflib
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+import unicodedata
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_SOURCE = os.path.join(DATA_DIR, "cities.tsv")
+DEFAULT_COUNTRIES = os.path.join(DATA_DIR, "countries.tsv")
+
+# Index layout: header | records | sorted key table | string blob
+_MAGIC = b"GZT2"
+_HEADER = struct.Struct("<4sIII")     # magic, record count, key count, blob size
+_RECORD = struct.Struct("<ddIIHIH")   # lat, lon, population, name offset/length, country offset/length
+_KEY = struct.Struct("<IHI")          # key offset, key length, record index
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", stripped.lower()).replace("_", " ").split())
+
+
+def _read_geonames(source_path: str):
+    """
+    Yield (name, aliases, lat, lon, country_code, population) from a
+    GeoNames cities dump (e.g. cities15000.txt) or the bundled subset.
+    """
+    with open(source_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15:
+                continue
+            try:
+                lat, lon = float(cols[4]), float(cols[5])
+                population = int(cols[14] or 0)
+            except ValueError:
+                continue
+            aliases = [cols[2]] + [a for a in cols[3].split(",") if a]
+            yield cols[1], aliases, lat, lon, cols[8], population
+
+
+def _read_countries(countries_path: str) -> Dict[str, Tuple[str, List[str]]]:
+    """Map country code -> (name, alternate names) from countries.tsv"""
+    countries = {}
+    if not countries_path or not os.path.exists(countries_path):
+        return countries
+    with open(countries_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 2:
+                continue
+            aliases = [a for a in cols[2].split(",") if a] if len(cols) > 2 else []
+            countries[cols[0]] = (cols[1], aliases)
+    return countries
+
+
+def default_index_path(source_path: str) -> str:
+    """
+    Writable per-user location for a source dump's index.
+
+    The index lives under $XDG_CACHE_HOME (or ~/.cache), falling back to
+    the system temp directory, so nothing is written next to the package.
+    """
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    directory = os.path.join(cache_home, "inkle")
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        directory = tempfile.gettempdir()
+    digest = hashlib.sha256(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(directory, f"{os.path.basename(source_path)}-{digest}.idx")
+
+
+def build_index(source_path: str, index_path: str, countries_path: str = DEFAULT_COUNTRIES) -> int:
+    """
+    Build a compact binary index from a GeoNames-format dump.
+    When several places share a name, the most populous one wins.
+
+    Args:
+        source_path: GeoNames-format TSV file
+        index_path: Where to write the index
+        countries_path: Country code -> name table used for qualifiers
+
+    Returns:
+        Number of distinct lookup keys written
+    """
+    countries = _read_countries(countries_path)
+    blob = bytearray()
+    records: List[Tuple[float, float, int, int, int, int, int]] = []
+    keys: Dict[bytes, Tuple[int, int]] = {}
+    country_entries: Dict[str, Tuple[int, int]] = {}
+
+    for name, aliases, lat, lon, country, population in _read_geonames(source_path):
+        country_name, country_aliases = countries.get(country, (country, []))
+        if country not in country_entries:
+            # One "CC<TAB>Name<TAB>alias,alias" entry per country, shared by its records
+            entry = "\t".join([country, country_name, ",".join(country_aliases)]).encode("utf-8")
+            country_entries[country] = (len(blob), len(entry))
+            blob += entry
+
+        display = f"{name}, {country_name}" if country_name else name
+        encoded = display.encode("utf-8")
+        record_id = len(records)
+        records.append((lat, lon, min(population, 0xFFFFFFFF), len(blob), len(encoded), *country_entries[country]))
+        blob += encoded
+
+        for alias in [name] + aliases:
+            key = normalize_name(alias)
+            # Skip short codes and numeric ids that would shadow real names
+            if len(key) < 3 or key.replace(" ", "").isdigit():
+                continue
+            key_bytes = key.encode("utf-8")[:0xFFFF]
+            current = keys.get(key_bytes)
+            if current is None or population > current[0]:
+                keys[key_bytes] = (population, record_id)
+
+    key_table = []
+    for key_bytes in sorted(keys):
+        key_table.append((len(blob), len(key_bytes), keys[key_bytes][1]))
+        blob += key_bytes
+
+    # A unique temp file per writer, so workers building concurrently don't clobber each other
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(index_path)), prefix=".gazetteer-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(records), len(key_table), len(blob)))
+            for record in records:
+                f.write(_RECORD.pack(*record))
+            for entry in key_table:
+                f.write(_KEY.pack(*entry))
+            f.write(blob)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(key_table)
+
+
+class Gazetteer:
+    """Exact, alias and fuzzy place lookup over a memory-mapped index"""
+
+    FUZZY_CUTOFF = 0.85
+    FUZZY_MAX_CANDIDATES = 5000
+
+    def __init__(self, index_path: str):
+        """
+        Args:
+            index_path: Index file produced by build_index()
+        """
+        self.index_path = index_path
+        with open(index_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.record_count, self.key_count, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a gazetteer index: {index_path}")
+        self._records_at = _HEADER.size
+        self._keys_at = self._records_at + self.record_count * _RECORD.size
+        self._blob_at = self._keys_at + self.key_count * _KEY.size
+
+    @classmethod
+    def load(
+        cls,
+        source_path: str = DEFAULT_SOURCE,
+        index_path: Optional[str] = None,
+        countries_path: str = DEFAULT_COUNTRIES
+    ) -> "Gazetteer":
+        """
+        Open the index for a source dump, (re)building it if missing, stale
+        or written by an older index format.
+
+        Args:
+            source_path: GeoNames-format TSV (default: bundled city list)
+            index_path: Index location (default: from default_index_path())
+            countries_path: Country code -> name table (default: bundled list)
+        """
+        index_path = index_path or default_index_path(source_path)
+        sources = [source_path] + ([countries_path] if os.path.exists(countries_path) else [])
+        newest_source = max(os.path.getmtime(path) for path in sources)
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < newest_source:
+            build_index(source_path, index_path, countries_path)
+            return cls(index_path)
+        try:
+            return cls(index_path)
+        except ValueError:
+            build_index(source_path, index_path, countries_path)
+            return cls(index_path)
+
+    @classmethod
+    def from_env(cls) -> Optional["Gazetteer"]:
+        """
+        Load the gazetteer configured by GAZETTEER_PATH / GAZETTEER_INDEX.
+        Set GAZETTEER_PATH to 'off' to disable local lookups.
+
+        Returns:
+            Gazetteer or None if disabled or unavailable
+        """
+        source_path = os.getenv("GAZETTEER_PATH", DEFAULT_SOURCE)
+        if source_path.lower() in ("off", "none", ""):
+            return None
+        try:
+            return cls.load(source_path, os.getenv("GAZETTEER_INDEX"))
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Gazetteer unavailable ({source_path}): {e}")
+            return None
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._blob_at + offset
+        return self._mm[start:start + length]
+
+    def _key_entry(self, index: int) -> Tuple[bytes, int]:
+        offset, length, record_id = _KEY.unpack_from(self._mm, self._keys_at + index * _KEY.size)
+        return self._string(offset, length), record_id
+
+    def _record(self, record_id: int) -> Dict:
+        lat, lon, _, name_offset, name_length, country_offset, country_length = _RECORD.unpack_from(
+            self._mm, self._records_at + record_id * _RECORD.size
+        )
+        country_code, country_name, _ = self._string(country_offset, country_length).decode("utf-8").split("\t")
+        return {
+            "lat": lat,
+            "lon": lon,
+            "display_name": self._string(name_offset, name_length).decode("utf-8"),
+            "country_code": country_code,
+            "country": country_name
+        }
+
+    def _country_names(self, record_id: int) -> set:
+        """Normalized code, name and alternate names of a record's country"""
+        _, _, _, _, _, country_offset, country_length = _RECORD.unpack_from(
+            self._mm, self._records_at + record_id * _RECORD.size
+        )
+        code, name, aliases = self._string(country_offset, country_length).decode("utf-8").split("\t")
+        names = [code, name] + [a for a in aliases.split(",") if a]
+        return {normalize_name(n) for n in names} - {""}
+
+    def _bisect(self, key: bytes) -> int:
+        """Index of the first key >= key"""
+        lo, hi = 0, self.key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _exact(self, key: str) -> Optional[int]:
+        """Record id for an exact key, or None"""
+        key_bytes = key.encode("utf-8")
+        index = self._bisect(key_bytes)
+        if index < self.key_count:
+            found, record_id = self._key_entry(index)
+            if found == key_bytes:
+                return record_id
+        return None
+
+    def _fuzzy(self, key: str, accept: Callable[[int], bool]) -> Optional[int]:
+        """Record id of the closest accepted key above FUZZY_CUTOFF, or None"""
+        # Candidates share the first two characters, a contiguous run of the sorted table
+        prefix = key[:2].encode("utf-8")
+        start = self._bisect(prefix)
+        end = min(self._bisect(prefix + b"\xff"), start + self.FUZZY_MAX_CANDIDATES)
+
+        best_ratio, best_record = self.FUZZY_CUTOFF, None
+        matcher = difflib.SequenceMatcher(b=key)
+        for index in range(start, end):
+            candidate, record_id = self._key_entry(index)
+            matcher.set_seq1(candidate.decode("utf-8"))
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio and accept(record_id):
+                best_ratio, best_record = ratio, record_id
+        return best_record
+
+    def lookup(self, place_name: str, fuzzy: bool = True) -> Optional[Dict]:
+        """
+        Resolve a place name locally.
+
+        A bare name must match a known name exactly. "Name, Country" also
+        tries the leading part, but only accepts a place in that country;
+        anything else (e.g. "Paris, Texas", or a misspelling with no
+        country to confirm it) is left to the online geocoder.
+
+        Args:
+            place_name: Name as typed by the user (e.g. "Bangalore, India")
+            fuzzy: Whether "Name, Country" may match approximately
+
+        Returns:
+            Dict with 'lat', 'lon', 'display_name', 'country_code' and
+            'country', or None if unknown
+        """
+        if not place_name:
+            return None
+
+        parts = [normalize_name(part) for part in place_name.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+
+        record_id = self._exact(" ".join(parts))
+        if record_id is not None:
+            return self._record(record_id)
+        if len(parts) == 1:
+            return None
+
+        # Every qualifier must name the matched place's country
+        name, qualifiers = parts[0], set(parts[1:])
+
+        def in_country(candidate: int) -> bool:
+            return qualifiers <= self._country_names(candidate)
+
+        record_id = self._exact(name)
+        if record_id is not None:
+            return self._record(record_id) if in_country(record_id) else None
+
+        if fuzzy and len(name) >= 4:
+            record_id = self._fuzzy(name, in_country)
+            if record_id is not None:
+                return self._record(record_id)
+        return None
+
+    def close(self):
+        self._mm.close()
+
+
+# For testing
+if __name__ == "__main__":
+    import time
+
+    gazetteer = Gazetteer.load()
+    print(f"Loaded {gazetteer.key_count} names for {gazetteer.record_count} places\n")
+
+    for place in ["Bangalore", "Bengaluru", "Paris, France", "Paris, Texas", "Tokyoo, Japan", "InvalidCity12345"]:
+        start = time.perf_counter()
+        result = gazetteer.lookup(place)
+        elapsed = (time.perf_counter() - start) * 1_000_000
+        if result:
+            print(f"  ✓ {place} -> {result['display_name']} ({result['lat']}, {result['lon']}) in {elapsed:.0f}µs")
+        else:
+            print(f"  ✗ {place} not found ({elapsed:.0f}µs)")
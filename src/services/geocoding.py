@@ -4,17 +4,45 @@ Converts place names to geographic coordinates.
 """
 
 import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, TYPE_CHECKING
+import threading
 import time
 
+if TYPE_CHECKING:
+    from services.cache import Cache
+    from services.gazetteer import Gazetteer
+    from services.negative_filter import NegativeLookupFilter
+
 
 class GeocodingService:
     """Handles place name to coordinates conversion using Nominatim API"""
     
     BASE_URL = "https://nominatim.openstreetmap.org/search"
     
-    def __init__(self):
-        self.session = requests.Session()
+    CACHE_TTL = 30 * 24 * 3600  # Place coordinates rarely change
+    MIN_INTERVAL = 1.0  # Nominatim usage policy: at most 1 request per second
+    
+    def __init__(
+        self,
+        cache: Optional["Cache"] = None,
+        gazetteer: Optional["Gazetteer"] = None,
+        negative_filter: Optional["NegativeLookupFilter"] = None,
+        session: Optional[requests.Session] = None
+    ):
+        """
+        Args:
+            cache: Optional cache view for resolved coordinates
+            gazetteer: Optional offline index consulted before Nominatim
+            negative_filter: Optional filter of place names Nominatim did not find
+            session: Optional pre-configured HTTP session (see services.transport)
+        """
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.negative_filter = negative_filter
+        self.min_interval = self.MIN_INTERVAL
+        self._rate_lock = threading.Lock()
+        self._last_request = 0.0
+        self.session = session or requests.Session()
         self.session.headers.update({
             "User-Agent": "TourismBot/1.0 (Educational Project)"
         })
@@ -31,6 +59,22 @@ class GeocodingService:
         """
         if not place_name or not place_name.strip():
             return None
+        
+        # Well-known places resolve locally without a network round-trip
+        if self.gazetteer is not None:
+            local = self.gazetteer.lookup(place_name)
+            if local:
+                return local
+        
+        # Known junk skips the rate-limit sleep and the Nominatim round-trip
+        if self.negative_filter is not None and self.negative_filter.contains(place_name):
+            return None
+        
+        cache_key = " ".join(place_name.lower().split())
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
             
         params = {
             "q": place_name.strip(),
@@ -41,7 +85,7 @@ class GeocodingService:
         
         try:
             # Nominatim requires rate limiting (1 request per second)
-            time.sleep(1)
+            self._wait_for_rate_limit()
             
             response = self.session.get(
                 self.BASE_URL, 
@@ -53,12 +97,18 @@ class GeocodingService:
             
             if results:
                 result = results[0]
-                return {
+                coords = {
                     "lat": float(result["lat"]),
                     "lon": float(result["lon"]),
                     "display_name": result.get("display_name", place_name)
                 }
+                if self.cache is not None:
+                    self.cache.set(cache_key, coords, self.CACHE_TTL)
+                return coords
             
+            # Only a definitive empty answer marks the place as nonexistent
+            if self.negative_filter is not None:
+                self.negative_filter.add(place_name)
             return None
             
         except requests.exceptions.RequestException as e:
@@ -67,6 +117,14 @@ class GeocodingService:
         except (KeyError, ValueError, IndexError) as e:
             print(f"Error parsing geocoding response: {e}")
             return None
+    
+    def _wait_for_rate_limit(self):
+        """Space requests min_interval apart, even across concurrent callers"""
+        with self._rate_lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
 
 
 # For testing
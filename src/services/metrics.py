@@ -0,0 +1,71 @@
+"""
+Request Metrics - Per-Request Timing and Counters
+Lets services attribute time (LLM, tool, upstream HTTP) and cache hits to
+the request being processed on the current thread or context.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class RequestMetrics:
+    """Accumulated timings (seconds) and counters for one request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.times: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add_time(self, kind: str, seconds: float):
+        with self._lock:
+            self.times[kind] = self.times.get(kind, 0.0) + seconds
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def as_dict(self) -> Dict:
+        """Times as '<kind>_ms' integers alongside the raw counters"""
+        with self._lock:
+            result = {f"{kind}_ms": int(seconds * 1000) for kind, seconds in self.times.items()}
+            result.update(self.counts)
+        return result
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+@contextmanager
+def collect():
+    """Collect metrics for everything run inside the block"""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record_time(kind: str, seconds: float):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_time(kind, seconds)
+
+
+def incr(name: str, amount: int = 1):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.incr(name, amount)
+
+
+@contextmanager
+def timed(kind: str):
+    """Add the block's wall time to the current request under kind"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(kind, time.perf_counter() - start)
@@ -0,0 +1,306 @@
+"""
+Negative Lookup Filter - Bloom Filter of Known-Nonexistent Places
+Lets repeated junk inputs short-circuit before any network call or LLM step.
+"""
+
+import atexit
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+_MAGIC = b"BLM1"
+_HEADER = struct.Struct("<4sQIQ")   # magic, bit count, hash count, items added
+
+# Persisted filter: current and previous generation ids, then both Bloom filters
+_FILE_MAGIC = b"NLF1"
+_FILE_HEADER = struct.Struct("<4sqq")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for a capacity and false-positive rate"""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Expected number of distinct items
+            error_rate: Target false-positive rate at capacity
+        """
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count) + bytes(self.bits)
+
+    def union(self, other: "BloomFilter"):
+        """OR another filter with the same parameters into this one"""
+        self.bits = bytearray(a | b for a, b in zip(self.bits, other.bits))
+        # Overlap between the two is unknown, so estimate the count from the set bits
+        set_bits = bin(int.from_bytes(self.bits, "little")).count("1")
+        if set_bits >= self.num_bits:
+            self.count = self.capacity
+        else:
+            estimate = -self.num_bits / self.num_hashes * math.log(1 - set_bits / self.num_bits)
+            self.count = max(self.count, other.count, int(round(estimate)))
+
+    def load_bytes(self, data: bytes) -> bool:
+        """
+        Restore state saved by to_bytes().
+
+        Returns:
+            False if the data is corrupt or sized for different parameters
+        """
+        if len(data) < _HEADER.size:
+            return False
+        magic, num_bits, num_hashes, count = _HEADER.unpack_from(data, 0)
+        bits = data[_HEADER.size:]
+        if (magic != _MAGIC or num_bits != self.num_bits
+                or num_hashes != self.num_hashes or len(bits) != len(self.bits)):
+            return False
+        self.bits = bytearray(bits)
+        self.count = count
+        return True
+
+
+class NegativeLookupFilter:
+    """
+    Persistent set of place strings known not to exist.
+    Membership may be a false positive (at the configured rate) but never
+    a false negative for live entries.
+
+    Entries age out: the filter keeps two generations, each spanning
+    max_age seconds of wall-clock time, so an entry is forgotten one to
+    two periods after it was added (places can start to exist, and
+    transient upstream failures shouldn't stick). A generation that
+    reaches capacity stops taking entries rather than let its
+    false-positive rate climb.
+
+    Processes sharing a file merge on save: under a file lock the on-disk
+    generations are ORed into memory before writing, so no writer drops
+    another's entries.
+    """
+
+    SAVE_INTERVAL = 5.0  # Seconds a new entry waits before a background write
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        max_age: float = 7 * 24 * 3600
+    ):
+        """
+        Args:
+            path: File to persist the filter to (None keeps it in memory)
+            capacity: Expected number of junk strings per generation
+            error_rate: Target false-positive rate
+            max_age: Seconds per generation; entries live one to two of these
+        """
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_age = max_age
+        self.generations: Dict[int, BloomFilter] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    loaded = self._decode(f.read())
+                if loaded is None:
+                    print(f"Ignoring negative filter at '{path}': parameters changed")
+                else:
+                    self.generations = loaded
+            except OSError as e:
+                print(f"Could not load negative filter from '{path}': {e}")
+        if path:
+            atexit.register(self.save)
+
+    @classmethod
+    def from_env(cls) -> Optional["NegativeLookupFilter"]:
+        """
+        Build the filter from environment variables.
+
+        Environment:
+            NEGATIVE_FILTER_PATH: Persistence file, 'off' disables (default: negative_places.bloom)
+            NEGATIVE_FILTER_CAPACITY: Expected entries per generation (default: 100000)
+            NEGATIVE_FILTER_ERROR_RATE: False-positive rate (default: 0.001)
+            NEGATIVE_FILTER_MAX_AGE: Seconds per generation (default: 604800, one week)
+        """
+        path = os.getenv("NEGATIVE_FILTER_PATH", "negative_places.bloom")
+        if path.lower() in ("off", "none", ""):
+            return None
+        return cls(
+            path,
+            capacity=int(os.getenv("NEGATIVE_FILTER_CAPACITY", "100000")),
+            error_rate=float(os.getenv("NEGATIVE_FILTER_ERROR_RATE", "0.001")),
+            max_age=float(os.getenv("NEGATIVE_FILTER_MAX_AGE", str(7 * 24 * 3600)))
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _generation_id(self) -> int:
+        # Derived from the wall clock, so every process agrees on the current generation
+        return int(time.time() // self.max_age)
+
+    def _live(self) -> Dict[int, BloomFilter]:
+        """Drop generations older than the previous one (caller holds the lock)"""
+        current = self._generation_id()
+        expired = [gen for gen in self.generations if gen < current - 1]
+        for gen in expired:
+            del self.generations[gen]
+        return self.generations
+
+    def contains(self, text: str) -> bool:
+        """Whether text was recorded as nonexistent (subject to false positives)"""
+        if not text:
+            return False
+        key = self.normalize(text)
+        with self._lock:
+            return any(key in bloom for bloom in self._live().values())
+
+    def add(self, text: str):
+        """Record text as nonexistent"""
+        if not text:
+            return
+        key = self.normalize(text)
+        with self._lock:
+            generations = self._live()
+            current = self._generation_id()
+            bloom = generations.get(current)
+            if bloom is None:
+                bloom = generations[current] = BloomFilter(self.capacity, self.error_rate)
+            if key in bloom or bloom.count >= bloom.capacity:
+                return
+            bloom.add(key)
+            self._dirty = True
+            self._schedule_save()
+
+    def _schedule_save(self):
+        """Arrange a background save (caller holds the lock)"""
+        # Saving takes a file lock and rewrites the file, so keep it off request threads
+        if not self.path or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.SAVE_INTERVAL, self._background_save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _background_save(self):
+        with self._lock:
+            self._save_timer = None
+        self.save()
+
+    def _encode(self, generations: Dict[int, BloomFilter]) -> bytes:
+        ids = sorted(generations, reverse=True)[:2] + [-1, -1]
+        data = bytearray(_FILE_HEADER.pack(_FILE_MAGIC, ids[0], ids[1]))
+        for gen in ids[:2]:
+            bloom = generations.get(gen) or BloomFilter(self.capacity, self.error_rate)
+            data += bloom.to_bytes()
+        return bytes(data)
+
+    def _decode(self, data: bytes) -> Optional[Dict[int, BloomFilter]]:
+        """Generations saved by _encode(), or None if corrupt or sized differently"""
+        if len(data) < _FILE_HEADER.size:
+            return None
+        magic, *ids = _FILE_HEADER.unpack_from(data, 0)
+        if magic != _FILE_MAGIC:
+            return None
+        size = len(BloomFilter(self.capacity, self.error_rate).to_bytes())
+        if len(data) != _FILE_HEADER.size + 2 * size:
+            return None
+        generations = {}
+        for i, gen in enumerate(ids):
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            offset = _FILE_HEADER.size + i * size
+            if not bloom.load_bytes(data[offset:offset + size]):
+                return None
+            if gen >= 0:
+                generations[gen] = bloom
+        return generations
+
+    def save(self):
+        """Merge with the file on disk and write it back if this process added entries"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+
+        try:
+            with open(f"{self.path}.lock", "a+b") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                on_disk = {}
+                if os.path.exists(self.path):
+                    with open(self.path, "rb") as f:
+                        on_disk = self._decode(f.read()) or {}
+
+                with self._lock:
+                    for gen, bloom in on_disk.items():
+                        if gen in self.generations:
+                            self.generations[gen].union(bloom)
+                        else:
+                            self.generations[gen] = bloom
+                    data = self._encode(self._live())
+
+                directory = os.path.dirname(os.path.abspath(self.path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".negative-", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError as e:
+            print(f"Could not save negative filter to '{self.path}': {e}")
+
+
+# For testing
+if __name__ == "__main__":
+    negatives = NegativeLookupFilter(capacity=1000, error_rate=0.01)
+    negatives.add("InvalidCity123")
+
+    print("Testing Negative Lookup Filter...\n")
+    print(f"  InvalidCity123 known missing: {negatives.contains('invalidcity123')}")
+    print(f"  Bangalore known missing: {negatives.contains('Bangalore')}")
+
+    sample = 10_000
+    false_positives = sum(negatives.contains(f"probe-{i}") for i in range(sample))
+    print(f"  False-positive rate over {sample} probes: {false_positives / sample:.4f}")
@@ -4,7 +4,10 @@ Fetches tourist attractions from OpenStreetMap data.
 """
 
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.cache import Cache
 
 
 class TourismService:
@@ -12,8 +15,16 @@ class TourismService:
     
     BASE_URL = "https://overpass-api.de/api/interpreter"
     
-    def __init__(self):
-        self.session = requests.Session()
+    CACHE_TTL = 24 * 3600  # OSM attraction data changes slowly
+    
+    def __init__(self, cache: Optional["Cache"] = None, session: Optional[requests.Session] = None):
+        """
+        Args:
+            cache: Optional cache view for attraction lists
+            session: Optional pre-configured HTTP session (see services.transport)
+        """
+        self.cache = cache
+        self.session = session or requests.Session()
     
     def get_attractions(
         self, 
@@ -34,6 +45,12 @@ class TourismService:
         Returns:
             List of attraction names
         """
+        cache_key = f"{latitude:.4f},{longitude:.4f}:{radius}:{max_results}"
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         # Overpass QL query to find tourism attractions
         query = f"""
         [out:json][timeout:25];
@@ -69,6 +86,8 @@ class TourismService:
                     if len(attractions) >= max_results:
                         break
             
+            if attractions and self.cache is not None:
+                self.cache.set(cache_key, attractions, self.CACHE_TTL)
             return attractions
             
         except requests.exceptions.RequestException as e:
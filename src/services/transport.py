@@ -0,0 +1,295 @@
+"""
+HTTP Transport - Shared Session Configuration for External APIs
+Pooled keep-alive sessions with retries, compression and connection-reuse stats.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+from services import metrics
+
+if TYPE_CHECKING:
+    from services.cache import Cache
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode 'br' responses)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class TransportStats:
+    """Thread-safe per-host counters for requests, connections and bytes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+        # Last counter values seen per pool, so recreated pools don't double count
+        self._pool_counters: Dict[int, tuple] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        return self._hosts.setdefault(host, {
+            "requests": 0,
+            "connections_opened": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "bytes_decoded": 0,
+            "errors": 0
+        })
+
+    def record(self, host: str, pool, bytes_sent: int, bytes_received: int, bytes_decoded: int):
+        with self._lock:
+            stats = self._host(host)
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+            stats["bytes_decoded"] += bytes_decoded
+            if pool is not None:
+                # urllib3 counts requests (including retries) and new connections per pool
+                last_connections, last_requests = self._pool_counters.get(id(pool), (0, 0))
+                stats["connections_opened"] += pool.num_connections - last_connections
+                stats["requests"] += pool.num_requests - last_requests
+                self._pool_counters[id(pool)] = (pool.num_connections, pool.num_requests)
+            else:
+                stats["requests"] += 1
+
+    def record_error(self, host: str):
+        with self._lock:
+            self._host(host)["errors"] += 1
+
+    def snapshot(self) -> Dict:
+        """Per-host counters plus totals, with derived reuse figures"""
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._hosts.items()}
+        totals = {}
+        for stats in hosts.values():
+            stats["connections_reused"] = max(0, stats["requests"] - stats["connections_opened"])
+            stats["reuse_ratio"] = round(stats["connections_reused"] / stats["requests"], 3) if stats["requests"] else 0.0
+            for key, value in stats.items():
+                if key != "reuse_ratio":
+                    totals[key] = totals.get(key, 0) + value
+        return {"hosts": hosts, "totals": totals}
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+            self._pool_counters.clear()
+
+
+transport_stats = TransportStats()
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter that records connection reuse and bytes transferred"""
+
+    def __init__(self, stats: TransportStats = transport_stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        host = urlsplit(request.url).hostname or "unknown"
+        body = request.body or b""
+        bytes_sent = len(body.encode("utf-8") if isinstance(body, str) else body)
+
+        start = time.perf_counter()
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+            bytes_received = bytes_decoded = 0
+            if not stream:
+                # requests reads the body right after send() anyway; doing it here
+                # lets us compare wire bytes against decompressed bytes
+                bytes_decoded = len(response.content)
+                bytes_received = response.raw.tell() or bytes_decoded
+        except requests.exceptions.RequestException:
+            self.stats.record_error(host)
+            raise
+        finally:
+            metrics.record_time("http", time.perf_counter() - start)
+            metrics.incr("http_requests")
+
+        try:
+            pool = self.poolmanager.connection_from_url(request.url)
+        except Exception:
+            pool = None
+        self.stats.record(host, pool, bytes_sent, bytes_received, bytes_decoded)
+        return response
+
+
+class FixtureAdapter(InstrumentedAdapter):
+    """
+    Adapter that records upstream responses into a Cache ('record') or
+    serves them back without touching the network ('replay').
+    """
+
+    # Bodies are stored decoded, so transfer framing headers no longer apply
+    _DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+    def __init__(self, fixtures: "Cache", mode: str = "replay", **kwargs):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        self.fixtures = fixtures
+        self.mode = mode
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def fixture_key(request) -> str:
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hashlib.sha256(f"{request.method} {request.url}".encode("utf-8") + b"\x00" + body)
+        return digest.hexdigest()
+
+    def send(self, request, stream=False, **kwargs):
+        key = self.fixture_key(request)
+
+        if self.mode == "replay":
+            recorded = self.fixtures.get(key)
+            if recorded is None:
+                metrics.incr("fixture_misses")
+                raise requests.exceptions.ConnectionError(
+                    f"No recorded fixture for {request.method} {request.url}", request=request
+                )
+            metrics.incr("fixture_hits")
+            return self._replay(request, recorded)
+
+        response = super().send(request, stream=False, **kwargs)
+        self.fixtures.set(key, {
+            "status": response.status_code,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in self._DROPPED_HEADERS
+            },
+            "content": response.content
+        })
+        return response
+
+    def _replay(self, request, recorded: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = recorded["content"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+class CappedRetry(Retry):
+    """Retry that never sleeps longer than max_retry_after on a Retry-After header"""
+
+    def __init__(self, *args, max_retry_after: float = 30.0, **kwargs):
+        self.max_retry_after = max_retry_after
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        # urllib3 rebuilds the object after every attempt; carry the cap along
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+def pool_size_for(host: str) -> int:
+    """
+    Connection pool size for a host.
+
+    Environment:
+        HTTP_POOL_SIZES: Per-host overrides, e.g. 'overpass-api.de=4,api.open-meteo.com=16'
+        HTTP_POOL_MAXSIZE: Default for other hosts (default: 10)
+    """
+    for entry in os.getenv("HTTP_POOL_SIZES", "").split(","):
+        name, _, size = entry.partition("=")
+        if name.strip() == host and size.strip().isdigit():
+            return int(size)
+    return int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+
+def create_session(
+    base_url: Optional[str] = None,
+    pool_maxsize: Optional[int] = None,
+    retries: Optional[int] = None,
+    backoff_factor: Optional[float] = None,
+    stats: TransportStats = transport_stats,
+    fixtures: Optional["Cache"] = None,
+    fixture_mode: str = "replay",
+    max_retry_after: Optional[float] = None
+) -> requests.Session:
+    """
+    Build a keep-alive session with pooling, retries and compression.
+
+    Args:
+        base_url: Main URL the session talks to, used to pick its pool size
+        pool_maxsize: Connections kept per host (default: from pool_size_for)
+        retries: Retry attempts for connection errors and 429/502/503/504 (default: HTTP_RETRIES or 3)
+        backoff_factor: Exponential backoff base in seconds (default: HTTP_BACKOFF or 0.5)
+        stats: Where to record transport counters
+        fixtures: Optional cache to record responses to or replay them from
+        fixture_mode: 'record' or 'replay' (used only with fixtures)
+        max_retry_after: Longest Retry-After wait honoured, in seconds
+            (default: HTTP_MAX_RETRY_AFTER or 30)
+
+    Returns:
+        Configured requests.Session
+
+    Read timeouts are not retried; because the retry budget for reads is
+    zero, urllib3 reports them as exhausted retries and callers see
+    requests.exceptions.ConnectionError rather than ReadTimeout.
+    """
+    host = urlsplit(base_url).hostname if base_url else ""
+    if pool_maxsize is None:
+        pool_maxsize = pool_size_for(host)
+    if retries is None:
+        retries = int(os.getenv("HTTP_RETRIES", "3"))
+    if backoff_factor is None:
+        backoff_factor = float(os.getenv("HTTP_BACKOFF", "0.5"))
+    if max_retry_after is None:
+        max_retry_after = float(os.getenv("HTTP_MAX_RETRY_AFTER", "30"))
+
+    retry = CappedRetry(
+        total=retries,
+        # A read timeout means the server may still be working (e.g. a heavy Overpass
+        # query); resending would pile duplicate load on it and multiply our latency
+        read=0,
+        backoff_factor=backoff_factor,
+        # Only statuses that say "try again"; a 500 is usually deterministic
+        status_forcelist=(429, 502, 503, 504),
+        # Overpass queries are POSTed but read-only, so retrying them is safe
+        allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        max_retry_after=max_retry_after
+    )
+    adapter_kwargs = {
+        "stats": stats,
+        "pool_connections": 4,
+        "pool_maxsize": pool_maxsize,
+        "max_retries": retry
+    }
+    if fixtures is not None:
+        adapter = FixtureAdapter(fixtures, fixture_mode, **adapter_kwargs)
+    else:
+        adapter = InstrumentedAdapter(**adapter_kwargs)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive"
+    })
+    return session
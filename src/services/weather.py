@@ -4,7 +4,10 @@ Fetches current weather and forecast data.
 """
 
 import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.cache import Cache
 
 
 class WeatherService:
@@ -12,8 +15,16 @@ class WeatherService:
     
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
     
-    def __init__(self):
-        self.session = requests.Session()
+    CACHE_TTL = 10 * 60  # Open-Meteo current weather updates every 15 min
+    
+    def __init__(self, cache: Optional["Cache"] = None, session: Optional[requests.Session] = None):
+        """
+        Args:
+            cache: Optional cache view for weather readings
+            session: Optional pre-configured HTTP session (see services.transport)
+        """
+        self.cache = cache
+        self.session = session or requests.Session()
     
     def get_weather(self, latitude: float, longitude: float) -> Optional[Dict]:
         """
@@ -26,6 +37,12 @@ class WeatherService:
         Returns:
             Dict with 'temperature' and 'precipitation_probability' or None
         """
+        cache_key = f"{latitude:.3f},{longitude:.3f}"
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         params = {
             "latitude": latitude,
             "longitude": longitude,
@@ -50,12 +67,15 @@ class WeatherService:
             precip_probs = hourly.get("precipitation_probability", [0])
             current_precip = precip_probs[0] if precip_probs else 0
             
-            return {
+            weather = {
                 "temperature": current.get("temperature"),
                 "precipitation_probability": current_precip,
                 "windspeed": current.get("windspeed", 0),
                 "weathercode": current.get("weathercode", 0)
             }
+            if self.cache is not None:
+                self.cache.set(cache_key, weather, self.CACHE_TTL)
+            return weather
             
         except requests.exceptions.RequestException as e:
             print(f"Weather API error: {e}")
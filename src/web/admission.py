@@ -0,0 +1,430 @@
+"""
+Admission Control - Concurrency Limiting and Per-Client Rate Limiting
+Bounds the work the Flask API accepts so admitted requests keep good latency.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import jsonify, make_response, request
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight requests and holds a bounded number of waiters.
+    Requests arriving to a full queue are shed immediately.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 16, queue_timeout: float = 10.0):
+        """
+        Args:
+            max_concurrent: Requests allowed to run at once
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before being shed
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+
+    def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            Seconds spent queued
+
+        Raises:
+            Overloaded: If the queue is full or the wait times out
+        """
+        start = time.monotonic()
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.active += 1
+            return 0.0
+
+        with self._lock:
+            if self.queued >= self.max_queue:
+                raise Overloaded("queue_full", self.queue_timeout)
+            self.queued += 1
+
+        try:
+            admitted = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+        if not admitted:
+            raise Overloaded("queue_timeout", self.queue_timeout)
+
+        with self._lock:
+            self.active += 1
+        return time.monotonic() - start
+
+    def try_acquire(self) -> bool:
+        """Take a free slot without waiting or queueing"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self.active += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+
+class RateLimiter:
+    """Per-client token buckets refilled at a steady rate"""
+
+    def __init__(self, rate_per_minute: float = 30, burst: int = 10, max_clients: int = 10_000):
+        """
+        Args:
+            rate_per_minute: Sustained requests per client per minute
+            burst: Bucket capacity (requests allowed back-to-back)
+            max_clients: Buckets kept before idle ones are pruned
+        """
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, client_id: str) -> Tuple[bool, float]:
+        """
+        Take a token for a client.
+
+        Returns:
+            (allowed, retry_after_seconds)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client_id, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[client_id] = (tokens - 1, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[client_id] = (tokens, now)
+                allowed = False
+                retry_after = (1 - tokens) / self.rate if self.rate > 0 else 60.0
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now: float):
+        # A bucket idle long enough to refill completely carries no state
+        full_after = self.burst / self.rate if self.rate > 0 else float("inf")
+        idle = [cid for cid, (_, updated) in self._buckets.items() if now - updated >= full_after]
+        for cid in idle:
+            del self._buckets[cid]
+
+
+class StreamLimiter:
+    """
+    Caps long-lived responses (e.g. Server-Sent Events) globally and per
+    client. Each stream pins a request thread, so excess streams are
+    refused outright rather than queued.
+    """
+
+    def __init__(self, max_streams: int = 16, max_per_client: int = 2):
+        """
+        Args:
+            max_streams: Open streams allowed across all clients
+            max_per_client: Open streams allowed per client
+        """
+        self.max_streams = max_streams
+        self.max_per_client = max_per_client
+        self._open: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def acquire(self, client_id: str) -> Optional[str]:
+        """
+        Open a stream for a client.
+
+        Returns:
+            None if admitted, else the rejection reason
+        """
+        with self._lock:
+            if self.active >= self.max_streams:
+                return "streams_full"
+            if self._open.get(client_id, 0) >= self.max_per_client:
+                return "client_streams_full"
+            self._open[client_id] = self._open.get(client_id, 0) + 1
+            self.active += 1
+        return None
+
+    def release(self, client_id: str):
+        with self._lock:
+            remaining = self._open.get(client_id, 0) - 1
+            if remaining > 0:
+                self._open[client_id] = remaining
+            else:
+                self._open.pop(client_id, None)
+            self.active -= 1
+
+
+class AdmissionMetrics:
+    """Counters and recent queue-time samples for admission decisions"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._queue_times = deque(maxlen=window)
+        self.admitted = 0
+        self.rejected = {
+            "rate_limited": 0,
+            "queue_full": 0,
+            "queue_timeout": 0,
+            "streams_full": 0,
+            "client_streams_full": 0
+        }
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    def record_admitted(self, queue_time: float):
+        with self._lock:
+            self.admitted += 1
+            self.total_queue_time += queue_time
+            self.max_queue_time = max(self.max_queue_time, queue_time)
+            self._queue_times.append(queue_time)
+
+    def record_rejected(self, reason: str):
+        with self._lock:
+            self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = sorted(self._queue_times)
+            admitted = self.admitted
+            return {
+                "admitted": admitted,
+                "rejected": dict(self.rejected),
+                "queue_time_ms": {
+                    "avg": int(self.total_queue_time / admitted * 1000) if admitted else 0,
+                    "p50": int(_percentile(samples, 0.50) * 1000),
+                    "p95": int(_percentile(samples, 0.95) * 1000),
+                    "max": int(self.max_queue_time * 1000)
+                }
+            }
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(math.ceil(fraction * len(samples))) - 1)
+    return samples[max(index, 0)]
+
+
+class AdmissionController:
+    """
+    Flask-facing admission control combining rate limiting, concurrency
+    limiting and stream limiting. Use .limit (or .limit_rate, .limit_stream)
+    as a route decorator.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        stream_limiter: Optional[StreamLimiter] = None
+    ):
+        self.limiter = limiter or ConcurrencyLimiter()
+        self.rate_limiter = rate_limiter
+        self.stream_limiter = stream_limiter or StreamLimiter()
+        self.metrics = AdmissionMetrics()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        Build a controller from environment variables.
+
+        Environment:
+            MAX_CONCURRENT_QUERIES: In-flight requests (default: 4)
+            MAX_QUEUED_QUERIES: Waiting requests before shedding (default: 16)
+            QUEUE_TIMEOUT: Max seconds queued (default: 10)
+            RATE_LIMIT_PER_MINUTE: Per-client rate, 0 disables (default: 30)
+            RATE_LIMIT_BURST: Per-client burst (default: 10)
+            MAX_STREAMS: Open event streams across all clients (default: 16)
+            MAX_STREAMS_PER_CLIENT: Open event streams per client (default: 2)
+        """
+        limiter = ConcurrencyLimiter(
+            max_concurrent=int(os.getenv("MAX_CONCURRENT_QUERIES", "4")),
+            max_queue=int(os.getenv("MAX_QUEUED_QUERIES", "16")),
+            queue_timeout=float(os.getenv("QUEUE_TIMEOUT", "10"))
+        )
+        rate = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+        rate_limiter = None
+        if rate > 0:
+            rate_limiter = RateLimiter(rate, int(os.getenv("RATE_LIMIT_BURST", "10")))
+        stream_limiter = StreamLimiter(
+            max_streams=int(os.getenv("MAX_STREAMS", "16")),
+            max_per_client=int(os.getenv("MAX_STREAMS_PER_CLIENT", "2"))
+        )
+        return cls(limiter, rate_limiter, stream_limiter)
+
+    def _check_rate(self):
+        """429 response if the caller is over its rate limit, else None"""
+        if self.rate_limiter is None:
+            return None
+        allowed, retry_after = self.rate_limiter.allow(client_id())
+        if allowed:
+            return None
+        self.metrics.record_rejected("rate_limited")
+        return _too_many_requests("Rate limit exceeded", retry_after)
+
+    def limit(self, view):
+        """Decorator that admits, queues or sheds requests to a route"""
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            rejected = self._check_rate()
+            if rejected is not None:
+                return rejected
+
+            try:
+                queue_time = self.limiter.acquire()
+            except Overloaded as e:
+                self.metrics.record_rejected(e.reason)
+                return _too_many_requests("Server is busy, please retry shortly", e.retry_after)
+
+            self.metrics.record_admitted(queue_time)
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                self.limiter.release()
+            return response
+
+        return wrapper
+
+    def limit_rate(self, view):
+        """Decorator applying only the per-client rate limit (for cheap routes)"""
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            rejected = self._check_rate()
+            if rejected is not None:
+                return rejected
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    def limit_stream(self, view):
+        """
+        Decorator for streaming routes: applies the rate limit and holds a
+        stream slot until the response is closed (the stream ends or the
+        client goes away).
+        """
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            rejected = self._check_rate()
+            if rejected is not None:
+                return rejected
+
+            client = client_id()
+            reason = self.stream_limiter.acquire(client)
+            if reason is not None:
+                self.metrics.record_rejected(reason)
+                return _too_many_requests("Too many open streams, please retry shortly", 5)
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                self.stream_limiter.release(client)
+                raise
+            response.call_on_close(lambda: self.stream_limiter.release(client))
+            return response
+
+        return wrapper
+
+    @contextmanager
+    def extra_slots(self, wanted: int):
+        """
+        Borrow up to `wanted` free concurrency slots for a request that fans
+        out into parallel work, so that work counts against the same limit.
+        Never waits: yields how many slots were actually taken.
+        """
+        taken = 0
+        try:
+            while taken < wanted and self.limiter.try_acquire():
+                taken += 1
+            yield taken
+        finally:
+            for _ in range(taken):
+                self.limiter.release()
+
+    def stats(self) -> Dict:
+        """Current limiter state plus admission metrics"""
+        stats = self.metrics.snapshot()
+        stats.update({
+            "active": self.limiter.active,
+            "queued": self.limiter.queued,
+            "max_concurrent": self.limiter.max_concurrent,
+            "max_queue": self.limiter.max_queue,
+            "streams": self.stream_limiter.active,
+            "max_streams": self.stream_limiter.max_streams
+        })
+        return stats
+
+
+def client_id() -> str:
+    """
+    Identify the caller by its socket address.
+
+    X-Forwarded-For is client-controlled and is not read here; behind a
+    reverse proxy, install ProxyFix (see trust_proxies) so remote_addr is
+    the address the trusted proxies saw.
+    """
+    return request.remote_addr or "unknown"
+
+
+def trust_proxies(app, count: Optional[int] = None):
+    """
+    Take the client address from X-Forwarded-For set by trusted proxies.
+
+    Only the last `count` hops are believed, so a client can't spoof its
+    identity (and its rate-limit bucket) by sending its own header.
+
+    Args:
+        app: Flask app to wrap
+        count: Reverse proxies in front of the app (default: TRUSTED_PROXIES or 0)
+
+    Environment:
+        TRUSTED_PROXIES: Number of reverse proxies in front of the app (default: 0)
+    """
+    if count is None:
+        count = int(os.getenv("TRUSTED_PROXIES", "0"))
+    if count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count)
+    return app
+
+
+def _too_many_requests(message: str, retry_after: float):
+    response = jsonify({
+        "success": False,
+        "error": message
+    })
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, int(math.ceil(retry_after))))
+    return response
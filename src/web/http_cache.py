@@ -0,0 +1,160 @@
+"""
+HTTP Caching - Response Compression, ETags and Cache-Control
+Keeps redundant bytes and requests off the wire for the dashboard API.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json"
+}
+
+
+def set_cache_control(response, max_age: int, public: bool = False):
+    """
+    Mark a response as reusable for max_age seconds, or not at all.
+
+    Args:
+        response: Flask response to update
+        max_age: Freshness lifetime in seconds (0 forbids storing)
+        public: Whether shared caches (proxies) may store it
+    """
+    if max_age > 0:
+        # send_from_directory marks files no-cache by default, which would override max-age
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = int(max_age)
+        if public:
+            response.cache_control.public = True
+        else:
+            response.cache_control.private = True
+    else:
+        response.cache_control.no_store = True
+    return response
+
+
+class ResponseCompressor:
+    """
+    Flask after-request hook that adds ETags to GET responses, answers
+    conditional requests with 304, and gzip/brotli-compresses bodies.
+    Compressed bodies of ETagged responses (e.g. the dashboard HTML) are
+    memoized so repeat hits don't recompress.
+    """
+
+    def __init__(self, app=None, min_size: int = 500, gzip_level: int = 6,
+                 brotli_quality: int = 5, memo_entries: int = 32):
+        """
+        Args:
+            app: Flask app to register with (or call init_app later)
+            min_size: Bodies smaller than this are sent as-is
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+            memo_entries: Compressed bodies kept, keyed by ETag and encoding
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.memo_entries = memo_entries
+        self._memo: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def _choose_encoding(self, response) -> Optional[str]:
+        if response.mimetype not in COMPRESSIBLE_TYPES:
+            return None
+        if response.content_length is not None and response.content_length < self.min_size:
+            return None
+        accepted = request.accept_encodings
+        if brotli is not None and accepted.quality("br") > 0:
+            return "br"
+        if accepted.quality("gzip") > 0:
+            return "gzip"
+        return None
+
+    def _compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level)
+
+    def _memoized(self, key: Optional[tuple], data: bytes, encoding: str) -> bytes:
+        if key is not None:
+            with self._lock:
+                cached = self._memo.get(key)
+                if cached is not None:
+                    self._memo.move_to_end(key)
+                    return cached
+        compressed = self._compress(data, encoding)
+        if key is not None:
+            with self._lock:
+                self._memo[key] = compressed
+                while len(self._memo) > self.memo_entries:
+                    self._memo.popitem(last=False)
+        return compressed
+
+    def after_request(self, response):
+        if response.status_code != 200 or "Content-Encoding" in response.headers:
+            return response
+        # Event streams must flow unbuffered; hashing or compressing would read them to the end
+        if response.mimetype == "text/event-stream":
+            return response
+
+        encoding = self._choose_encoding(response)
+        if response.mimetype in COMPRESSIBLE_TYPES:
+            response.vary.add("Accept-Encoding")
+
+        base_etag = None
+        # Only a validator derived from the exact bytes (a body hash or a file's
+        # own ETag) can key the memo; a view-set ETag may cover just part of the body
+        memoizable = False
+        if request.method in ("GET", "HEAD"):
+            is_file = response.direct_passthrough
+            # File responses stream straight from disk; read them so we can hash/compress
+            response.direct_passthrough = False
+            if response.get_etag()[0] is None:
+                response.add_etag()
+                memoizable = True
+            else:
+                memoizable = is_file
+            base_etag, weak = response.get_etag()
+            if encoding:
+                # Each encoding is its own representation and needs its own validator
+                response.set_etag(f"{base_etag}-{encoding}", weak)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if encoding is None:
+            return response
+
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        memo_key = (base_etag, encoding) if base_etag and memoizable else None
+        compressed = self._memoized(memo_key, data, encoding)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,323 @@
+"""
+Background Jobs - Persistent Queue for Long-Running Queries
+Runs slow trip-planning queries off the request thread. Jobs and results
+live in SQLite so any worker process can serve them and queued or
+abandoned jobs are picked up again after a restart.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class JobStore:
+    """SQLite-backed job table shared by every worker process on the host"""
+
+    def __init__(self, path: str = "jobs.sqlite3"):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_until REAL,
+                    claim_token TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per operation keeps this safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def create(self, query: str) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, query, status, created_at) VALUES (?, ?, 'queued', ?)",
+                (job_id, query, time.time())
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row["id"],
+            "query": row["query"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def count_pending(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def claim_next(self, lease_seconds: float) -> Optional[Dict]:
+        """
+        Atomically move the oldest runnable job to 'running'.
+        Running jobs whose lease expired (their worker died) are runnable again.
+        Each claim gets a fresh token; only its holder can extend or finish the job.
+
+        Returns:
+            Dict with 'id', 'query', 'attempts' and 'claim_token', or None
+            if nothing is waiting
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, query, attempts FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, lease_until = ?, "
+                        "claim_token = ?, attempts = attempts + 1 WHERE id = ?",
+                        (now, now + lease_seconds, token, row["id"])
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row["id"], "query": row["query"], "attempts": row["attempts"] + 1, "claim_token": token}
+
+    def heartbeat(self, job_id: str, claim_token: str, lease_seconds: float) -> bool:
+        """
+        Extend a running job's lease.
+
+        Returns:
+            False if the claim was lost (the job was reclaimed by another worker)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND claim_token = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, claim_token)
+            )
+        return cursor.rowcount > 0
+
+    def finish(
+        self,
+        job_id: str,
+        claim_token: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Record a job's outcome, if this claim still owns it.
+
+        Returns:
+            False if the job was reclaimed meanwhile (its new owner reports instead)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE id = ? AND claim_token = ? AND status = 'running'",
+                (
+                    "failed" if error is not None else "succeeded",
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    claim_token
+                )
+            )
+        return cursor.rowcount > 0
+
+    def purge(self, older_than: float):
+        """Delete finished jobs older than the given age in seconds"""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND finished_at < ?",
+                (time.time() - older_than,)
+            )
+
+
+class JobQueue:
+    """
+    Pool of worker threads pulling jobs from a JobStore.
+    Threads rather than processes: the orchestrator (LLM client, sessions,
+    caches) is shared in-process and isn't picklable.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[str], Dict],
+        workers: int = 2,
+        max_pending: int = 100,
+        lease_seconds: float = 600,
+        poll_interval: float = 1.0,
+        retention: float = 24 * 3600,
+        max_attempts: int = 3
+    ):
+        """
+        Args:
+            store: Where jobs and results are persisted
+            handler: Runs a query and returns a JSON-serializable result
+            workers: Worker threads in this process
+            max_pending: Queued/running jobs accepted before submit() refuses
+            lease_seconds: How long a running job is owned without a heartbeat
+                before it's retried (workers renew it every third of this)
+            poll_interval: Seconds idle workers wait before checking the store
+            retention: Seconds finished jobs are kept
+            max_attempts: Runs (including restarts) before a job is failed
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.max_attempts = max_attempts
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_purge = 0.0
+
+    @classmethod
+    def from_env(cls, handler: Callable[[str], Dict]) -> "JobQueue":
+        """
+        Build a queue from environment variables.
+
+        Environment:
+            JOBS_DB: SQLite file (default: jobs.sqlite3)
+            JOB_WORKERS: Worker threads per process (default: 2)
+            JOB_MAX_PENDING: Pending jobs accepted (default: 100)
+            JOB_LEASE_SECONDS: Seconds before an abandoned job is retried (default: 600)
+        """
+        return cls(
+            JobStore(os.getenv("JOBS_DB", "jobs.sqlite3")),
+            handler,
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            max_pending=int(os.getenv("JOB_MAX_PENDING", "100")),
+            lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "600"))
+        )
+
+    def start(self):
+        """Start worker threads; jobs left over from a previous run are resumed"""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def submit(self, query: str) -> Optional[str]:
+        """
+        Queue a query.
+
+        Returns:
+            Job id, or None if too many jobs are already pending
+        """
+        if self.store.count_pending() >= self.max_pending:
+            return None
+        job_id = self.store.create(query)
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim_next(self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"Job queue error: {e}")
+                job = None
+
+            if job is None:
+                self._maybe_purge()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self._run(job)
+            except sqlite3.Error as e:
+                # The lease lapses and another worker (or a restart) retries the job
+                print(f"Job queue error while running {job['id']}: {e}")
+
+    def _run(self, job: Dict):
+        job_id, token = job["id"], job["claim_token"]
+        if job["attempts"] > self.max_attempts:
+            self.store.finish(job_id, token, error="Job abandoned after repeated worker restarts")
+            return
+
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job_id, token, done), name=f"job-heartbeat-{job_id[:8]}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            outcome = {"result": self.handler(job["query"])}
+        except Exception as e:
+            outcome = {"error": str(e)}
+        finally:
+            done.set()
+            heartbeat.join()
+        if not self.store.finish(job_id, token, **outcome):
+            print(f"Job {job_id} was reclaimed by another worker; discarding this result")
+
+    def _heartbeat(self, job_id: str, token: str, done: threading.Event):
+        # Keep the lease alive while the handler runs, so slow jobs aren't retried mid-flight
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                if not self.store.heartbeat(job_id, token, self.lease_seconds):
+                    return
+            except sqlite3.Error as e:
+                print(f"Job heartbeat error: {e}")
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge < 3600:
+            return
+        self._last_purge = now
+        try:
+            self.store.purge(self.retention)
+        except sqlite3.Error as e:
+            print(f"Job purge error: {e}")
@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Make the src/ packages importable the same way app.py and main.py do
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    The Flask app module, imported with throwaway stores and no OpenAI key
+    (so no orchestrator; tests install stubs where they need one).
+    """
+    tmp = tmp_path_factory.mktemp("app")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENAI_API_KEY", "")
+        mp.setenv("CACHE_BACKEND", "memory")
+        mp.setenv("NEGATIVE_FILTER_PATH", "off")
+        mp.setenv("GAZETTEER_PATH", "off")
+        mp.setenv("JOBS_DB", str(tmp / "jobs.sqlite3"))
+        mp.setenv("TEST_FIXTURES", str(tmp / "fixtures.sqlite3"))
+        import app
+    return app
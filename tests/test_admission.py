@@ -0,0 +1,243 @@
+"""Tests for admission control: concurrency, rate and stream limits"""
+
+import threading
+import time
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from web import admission
+from web.admission import (
+    AdmissionController, ConcurrencyLimiter, Overloaded, RateLimiter, StreamLimiter, client_id, trust_proxies
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", fake)
+    return fake
+
+
+def blocking_app(controller):
+    """App whose /slow route holds its admission slot until released"""
+    app = Flask(__name__)
+    entered, release = threading.Event(), threading.Event()
+
+    @app.route("/slow")
+    @controller.limit
+    def slow():
+        entered.set()
+        release.wait(5)
+        return jsonify({"ok": True})
+
+    @app.route("/fail")
+    @controller.limit
+    def fail():
+        raise RuntimeError("boom")
+
+    return app, entered, release
+
+
+def hold_slot(app, entered):
+    thread = threading.Thread(target=lambda: app.test_client().get("/slow"))
+    thread.start()
+    assert entered.wait(5)
+    return thread
+
+
+def test_sheds_when_queue_is_full():
+    controller = AdmissionController(ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=2))
+    app, entered, release = blocking_app(controller)
+    holder = hold_slot(app, entered)
+    try:
+        response = app.test_client().get("/slow")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert controller.metrics.snapshot()["rejected"]["queue_full"] == 1
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_sheds_after_queue_timeout():
+    controller = AdmissionController(ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=0.1))
+    app, entered, release = blocking_app(controller)
+    holder = hold_slot(app, entered)
+    try:
+        start = time.monotonic()
+        response = app.test_client().get("/slow")
+        assert response.status_code == 429
+        assert time.monotonic() - start >= 0.1
+        assert int(response.headers["Retry-After"]) >= 1
+        assert controller.metrics.snapshot()["rejected"]["queue_timeout"] == 1
+        assert controller.limiter.queued == 0
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_slot_released_when_view_raises():
+    controller = AdmissionController(ConcurrencyLimiter(max_concurrent=1, max_queue=0))
+    app, _, release = blocking_app(controller)
+    release.set()
+
+    assert app.test_client().get("/fail").status_code == 500
+    assert controller.limiter.active == 0
+    assert app.test_client().get("/slow").status_code == 200
+
+
+def test_queued_request_admitted_when_slot_frees():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=5)
+    limiter.acquire()
+    threading.Timer(0.1, limiter.release).start()
+
+    waited = limiter.acquire()
+
+    assert waited >= 0.05
+    assert limiter.active == 1
+    with pytest.raises(Overloaded):
+        ConcurrencyLimiter(max_concurrent=0, max_queue=0).acquire()
+
+
+def test_token_bucket_refills(clock):
+    limiter = RateLimiter(rate_per_minute=60, burst=2)
+
+    assert limiter.allow("a") == (True, 0.0)
+    assert limiter.allow("a") == (True, 0.0)
+    allowed, retry_after = limiter.allow("a")
+    assert not allowed and retry_after == pytest.approx(1.0)
+    assert limiter.allow("b")[0]
+
+    clock.now += 1.0
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("a")[0]
+
+
+def test_idle_buckets_are_pruned(clock):
+    limiter = RateLimiter(rate_per_minute=60, burst=2, max_clients=2)
+    limiter.allow("a")
+    limiter.allow("b")
+
+    clock.now += 2.0  # long enough for both buckets to refill completely
+    limiter.allow("c")
+
+    assert set(limiter._buckets) == {"c"}
+
+
+def test_rate_limited_requests_get_429(clock):
+    controller = AdmissionController(ConcurrencyLimiter(), RateLimiter(rate_per_minute=30, burst=1))
+    app = Flask(__name__)
+
+    @app.route("/cheap")
+    @controller.limit_rate
+    def cheap():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+    assert client.get("/cheap").status_code == 200
+    response = client.get("/cheap")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_extra_slots_accounting():
+    controller = AdmissionController(ConcurrencyLimiter(max_concurrent=4))
+    controller.limiter.acquire()  # the request's own slot
+
+    with controller.extra_slots(5) as extra:
+        assert extra == 3
+        assert controller.limiter.active == 4
+        with controller.extra_slots(2) as none_left:
+            assert none_left == 0
+    assert controller.limiter.active == 1
+
+    with pytest.raises(RuntimeError):
+        with controller.extra_slots(2):
+            raise RuntimeError("boom")
+    assert controller.limiter.active == 1
+
+
+def client_id_app(monkeypatch, trusted=None):
+    if trusted is None:
+        monkeypatch.delenv("TRUSTED_PROXIES", raising=False)
+    else:
+        monkeypatch.setenv("TRUSTED_PROXIES", str(trusted))
+    app = Flask(__name__)
+    trust_proxies(app)
+
+    @app.route("/whoami")
+    def whoami():
+        return client_id()
+
+    return app.test_client()
+
+
+def test_client_id_ignores_spoofed_forwarded_for(monkeypatch):
+    client = client_id_app(monkeypatch)
+    response = client.get("/whoami", headers={"X-Forwarded-For": "1.2.3.4"},
+                          environ_base={"REMOTE_ADDR": "10.0.0.5"})
+
+    assert response.get_data(as_text=True) == "10.0.0.5"
+
+
+def test_client_id_trusts_configured_proxies(monkeypatch):
+    client = client_id_app(monkeypatch, trusted=1)
+    # Only the hop appended by our one trusted proxy counts; the client's own entry is ignored
+    response = client.get("/whoami", headers={"X-Forwarded-For": "6.6.6.6, 203.0.113.7"},
+                          environ_base={"REMOTE_ADDR": "10.0.0.1"})
+
+    assert response.get_data(as_text=True) == "203.0.113.7"
+
+
+def make_app(controller):
+    app = Flask(__name__)
+
+    @app.route("/events")
+    @controller.limit_stream
+    def events():
+        return Response(iter(["data: one\n\n"]), mimetype="text/event-stream")
+
+    return app
+
+
+def get_stream(client, addr):
+    return client.get("/events", environ_base={"REMOTE_ADDR": addr}, buffered=False)
+
+
+def test_streams_capped_per_client_and_released_on_close():
+    controller = AdmissionController(ConcurrencyLimiter(), stream_limiter=StreamLimiter(max_streams=3, max_per_client=1))
+    client = make_app(controller).test_client()
+
+    first = get_stream(client, "10.0.0.1")
+    assert first.status_code == 200
+    rejected = get_stream(client, "10.0.0.1")
+    assert rejected.status_code == 429
+    assert "Retry-After" in rejected.headers
+    assert get_stream(client, "10.0.0.2").status_code == 200
+
+    first.close()
+    assert controller.stream_limiter.active == 1
+    assert get_stream(client, "10.0.0.1").status_code == 200
+
+
+def test_streams_capped_globally():
+    controller = AdmissionController(ConcurrencyLimiter(), stream_limiter=StreamLimiter(max_streams=2, max_per_client=2))
+    client = make_app(controller).test_client()
+
+    open_streams = [get_stream(client, f"10.0.0.{i}") for i in range(2)]
+    assert all(r.status_code == 200 for r in open_streams)
+    assert get_stream(client, "10.0.0.9").status_code == 429
+    assert controller.metrics.snapshot()["rejected"]["streams_full"] == 1
+
+    for response in open_streams:
+        response.close()
+    assert controller.stream_limiter.active == 0
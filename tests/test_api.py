@@ -0,0 +1,22 @@
+"""Tests for the Flask API routes"""
+
+from functools import partial
+
+from agents.test_runner import get_fixture_orchestrator
+
+
+def test_replay_without_fixtures_is_a_client_error(app_module, monkeypatch, tmp_path):
+    missing = str(tmp_path / "missing.sqlite3")
+    monkeypatch.setattr(app_module, "get_fixture_orchestrator",
+                        partial(get_fixture_orchestrator, fixtures_path=missing))
+
+    response = app_module.app.test_client().get("/api/test?mode=replay")
+
+    assert response.status_code == 409
+    assert "python main.py test --record" in response.get_json()["error"]
+
+
+def test_record_mode_is_cli_only(app_module):
+    response = app_module.app.test_client().get("/api/test?mode=record")
+
+    assert response.status_code == 403
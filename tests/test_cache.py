@@ -0,0 +1,149 @@
+"""Tests for the pluggable cache backends"""
+
+import time
+
+import pytest
+
+from services.cache import Cache, MemoryBackend, RedisBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisBackend(client=fakeredis.FakeRedis())
+
+
+def test_set_and_get_round_trip(backend):
+    cache = Cache(backend, namespace="test:")
+    cache.set("bangalore", {"lat": 12.97, "lon": 77.59})
+
+    assert cache.get("bangalore") == {"lat": 12.97, "lon": 77.59}
+    assert cache.get("paris") is None
+    assert cache.get("paris", default="missing") == "missing"
+
+
+def test_ttl_expiry(backend):
+    cache = Cache(backend, namespace="test:")
+    cache.set("short", "value", ttl=0.2)
+    cache.set("long", "value", ttl=60)
+
+    assert cache.get("short") == "value"
+    time.sleep(0.3)
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+
+
+def test_namespace_default_ttl(backend):
+    weather = Cache(backend, namespace="test:").namespace("weather", default_ttl=0.2)
+    weather.set("12.972,77.594", {"temperature": 24})
+
+    time.sleep(0.3)
+    assert weather.get("12.972,77.594") is None
+
+
+def test_clear_only_touches_its_namespace(backend):
+    root = Cache(backend, namespace="test:")
+    geocoding = root.namespace("geocoding")
+    weather = root.namespace("weather")
+    geocoding.set("paris", 1)
+    weather.set("paris", 2)
+
+    geocoding.clear()
+
+    assert geocoding.get("paris") is None
+    assert weather.get("paris") == 2
+
+
+def test_get_or_set_skips_none(backend):
+    cache = Cache(backend, namespace="test:")
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_set("missing", factory) is None
+    assert cache.get_or_set("missing", factory) is None
+    assert len(calls) == 2
+    assert cache.get_or_set("present", lambda: "value") == "value"
+    assert cache.get_or_set("present", lambda: "other") == "value"
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_bytes=300)
+    for i in range(3):
+        backend.set(f"key{i}", b"x" * 100)
+    backend.get("key0")  # key1 becomes least recently used
+
+    backend.set("key3", b"x" * 100)
+
+    assert backend.total_size() <= 300
+    assert backend.get("key1") is None
+    assert backend.get("key0") is not None
+    assert backend.get("key3") is not None
+
+
+def test_sqlite_backend_evicts_least_recently_accessed(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=300)
+    for i in range(3):
+        backend.set(f"key{i}", b"x" * 100)
+
+    backend.set("key3", b"x" * 100)
+
+    assert backend.total_size() <= 300
+    assert backend.get("key0") is None
+    assert backend.get("key3") is not None
+
+
+def test_sqlite_backend_tracks_size_across_overwrites_and_deletes(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    backend.set("a", b"x" * 100)
+    backend.set("a", b"x" * 40)
+    backend.set("b", b"x" * 10)
+    assert backend.total_size() == 50
+
+    backend.delete("a")
+    assert backend.total_size() == 10
+
+    backend.clear()
+    assert backend.total_size() == 0
+
+
+def test_sqlite_backend_shared_between_connections(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = Cache(SQLiteBackend(path), namespace="test:")
+    reader = Cache(SQLiteBackend(path), namespace="test:")
+
+    writer.set("bangalore", {"lat": 12.97})
+
+    assert reader.get("bangalore") == {"lat": 12.97}
+
+
+def test_oversized_values_are_not_stored():
+    backend = MemoryBackend(max_bytes=10)
+    backend.set("big", b"x" * 11)
+
+    assert backend.get("big") is None
+
+
+def test_reads_count_as_cache_metrics_unless_disabled():
+    from services import metrics
+
+    tracked = Cache(MemoryBackend(), namespace="test:")
+    untracked = Cache(MemoryBackend(), namespace="fixtures:", track_metrics=False).namespace("http")
+    tracked.set("a", 1)
+    untracked.set("a", 1)
+
+    with metrics.collect() as collected:
+        tracked.get("a")
+        tracked.get("b")
+        untracked.get("a")
+        untracked.get("b")
+
+    counts = collected.as_dict()
+    assert counts.get("cache_hits") == 1
+    assert counts.get("cache_misses") == 1
@@ -0,0 +1,43 @@
+"""Tests for offline gazetteer lookups"""
+
+import os
+
+import pytest
+
+from services.gazetteer import Gazetteer, default_index_path
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    gazetteer = Gazetteer.load(index_path=str(tmp_path / "cities.idx"))
+    yield gazetteer
+    gazetteer.close()
+
+
+def test_exact_and_alias_lookup(gazetteer):
+    assert gazetteer.lookup("Bangalore")["display_name"] == "Bengaluru, India"
+    assert gazetteer.lookup("Bengaluru")["country_code"] == "IN"
+
+
+def test_country_qualifier_must_match(gazetteer):
+    assert gazetteer.lookup("Paris, France")["country_code"] == "FR"
+    assert gazetteer.lookup("Paris, FR")["country_code"] == "FR"
+    assert gazetteer.lookup("Paris, Texas") is None
+
+
+def test_fuzzy_match_requires_country(gazetteer):
+    assert gazetteer.lookup("Berlinx") is None
+    assert gazetteer.lookup("Berlinn, Germany")["display_name"] == "Berlin, Germany"
+    assert gazetteer.lookup("Berlinn, France") is None
+
+
+def test_unknown_place(gazetteer):
+    assert gazetteer.lookup("InvalidCity123") is None
+
+
+def test_default_index_is_outside_package(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    path = default_index_path("/srv/data/cities15000.txt")
+
+    assert path.startswith(str(tmp_path))
+    assert os.path.basename(path).startswith("cities15000.txt-")
@@ -0,0 +1,152 @@
+"""Tests for response compression, ETags and Cache-Control"""
+
+import gzip
+import json
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from web.http_cache import ResponseCompressor, brotli, set_cache_control
+
+ENCODINGS = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+BODY = {"places": ["Lalbagh Botanical Garden", "Cubbon Park", "Bangalore Palace"] * 40}
+
+
+def directives(response) -> set:
+    return {part.strip() for part in response.headers["Cache-Control"].split(",")}
+
+
+def decode(response) -> bytes:
+    data = response.get_data()
+    encoding = response.headers.get("Content-Encoding")
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    return data
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    ResponseCompressor(app)
+    counter = {"calls": 0}
+
+    @app.route("/static-json")
+    def static_json():
+        return jsonify(BODY)
+
+    @app.route("/changing")
+    def changing():
+        # Same ETag each time, but a body that differs per request (like /api/query's timing)
+        counter["calls"] += 1
+        response = jsonify({**BODY, "call": counter["calls"]})
+        response.set_etag("answer-v1")
+        return response
+
+    @app.route("/events")
+    def events():
+        def stream():
+            yield "data: one\n\n"
+            yield "data: two\n\n"
+        return Response(stream(), mimetype="text/event-stream")
+
+    return app.test_client()
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_conditional_get_round_trip(client, encoding):
+    headers = {"Accept-Encoding": encoding}
+    first = client.get("/static-json", headers=headers)
+    assert first.status_code == 200
+    assert json.loads(decode(first)) == BODY
+    if encoding != "identity":
+        assert first.headers["Content-Encoding"] == encoding
+        assert first.headers["ETag"].endswith(f'-{encoding}"')
+    assert "Accept-Encoding" in first.headers["Vary"]
+
+    second = client.get("/static-json", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.get_data() == b""
+
+
+def test_validators_differ_per_encoding(client):
+    identity = client.get("/static-json", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/static-json", headers={"Accept-Encoding": "gzip"})
+
+    assert identity.headers["ETag"] != gzipped.headers["ETag"]
+    stale = client.get("/static-json", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": identity.headers["ETag"]
+    })
+    assert stale.status_code == 200
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_body_matches_what_the_view_returned(client, encoding):
+    calls = [json.loads(decode(client.get("/changing", headers={"Accept-Encoding": encoding})))["call"]
+             for _ in range(3)]
+
+    assert calls == sorted(set(calls)) and len(calls) == 3
+
+
+def test_event_stream_passes_through(client):
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert "ETag" not in response.headers
+    assert response.get_data() == b"data: one\n\ndata: two\n\n"
+
+
+def test_set_cache_control():
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = Response("x")
+        response.cache_control.no_cache = True
+        set_cache_control(response, 300, public=True)
+        assert directives(response) == {"public", "max-age=300"}
+
+        assert directives(set_cache_control(Response("x"), 60)) == {"private", "max-age=60"}
+        assert directives(set_cache_control(Response("x"), 0)) == {"no-store"}
+
+
+class StubOrchestrator:
+    def __init__(self, max_age=600):
+        self.max_age = max_age
+        self.calls = 0
+
+    def process_query(self, query):
+        self.calls += 1
+        return {"success": True, "output": f"Answer for {query}. " * 50, "max_age": self.max_age}
+
+
+def test_dashboard_cache_control(app_module):
+    response = app_module.app.test_client().get("/")
+
+    assert response.status_code == 200
+    assert directives(response) == {"public", f"max-age={app_module.DASHBOARD_MAX_AGE}"}
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_query_get_is_cacheable_and_revalidates(app_module, monkeypatch, encoding):
+    monkeypatch.setattr(app_module, "orchestrator", StubOrchestrator())
+    client = app_module.app.test_client()
+    headers = {"Accept-Encoding": encoding}
+
+    first = client.get("/api/query?q=Bangalore", headers=headers)
+    assert first.status_code == 200
+    assert directives(first) == {"private", "max-age=600"}
+    assert json.loads(decode(first))["response"].startswith("Answer for Bangalore")
+
+    second = client.get("/api/query?q=Bangalore", headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+
+
+def test_query_post_and_uncacheable_answers(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "orchestrator", StubOrchestrator(max_age=0))
+    client = app_module.app.test_client()
+
+    posted = client.post("/api/query", json={"query": "Bangalore"})
+    fetched = client.get("/api/query?q=Bangalore")
+
+    assert posted.status_code == 200 and directives(posted) == {"no-store"}
+    assert directives(fetched) == {"no-store"}
@@ -0,0 +1,92 @@
+"""Tests for the persistent background job queue"""
+
+import threading
+import time
+
+from web.jobs import JobQueue, JobStore
+
+
+def test_claim_and_finish(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("Plan my trip to Bangalore")
+
+    job = store.claim_next(lease_seconds=60)
+    assert job["id"] == job_id and job["attempts"] == 1
+    assert store.claim_next(lease_seconds=60) is None
+
+    assert store.finish(job_id, job["claim_token"], result={"response": "ok"})
+    finished = store.get(job_id)
+    assert finished["status"] == "succeeded"
+    assert finished["result"] == {"response": "ok"}
+
+
+def test_stale_claim_cannot_finish_reclaimed_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("Plan my trip to Bangalore")
+
+    stale = store.claim_next(lease_seconds=0)
+    time.sleep(0.01)
+    current = store.claim_next(lease_seconds=60)
+    assert current["id"] == job_id and current["attempts"] == 2
+
+    assert not store.heartbeat(job_id, stale["claim_token"], 60)
+    assert not store.finish(job_id, stale["claim_token"], error="worker timed out")
+    assert store.get(job_id)["status"] == "running"
+
+    assert store.finish(job_id, current["claim_token"], result={"response": "ok"})
+    assert store.get(job_id)["status"] == "succeeded"
+
+
+def test_heartbeat_keeps_slow_job_leased(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    release = threading.Event()
+
+    def handler(query):
+        release.wait(5)
+        return {"response": query}
+
+    queue = JobQueue(store, handler, workers=1, lease_seconds=0.3, poll_interval=0.05)
+    queue.start()
+    try:
+        job_id = queue.submit("slow query")
+        time.sleep(1.0)
+        # Well past the original lease, but the heartbeat kept it from being reclaimed
+        assert store.claim_next(lease_seconds=60) is None
+
+        release.set()
+        deadline = time.time() + 5
+        while queue.get(job_id)["status"] == "running" and time.time() < deadline:
+            time.sleep(0.05)
+        job = queue.get(job_id)
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"response": "slow query"}
+    finally:
+        release.set()
+        queue.stop()
+
+
+def test_worker_survives_store_errors(tmp_path, monkeypatch):
+    import sqlite3
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    real_finish = store.finish
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_finish(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return real_finish(*args, **kwargs)
+
+    monkeypatch.setattr(store, "finish", flaky_finish)
+    queue = JobQueue(store, lambda query: {"response": query}, workers=1, poll_interval=0.05)
+    queue.start()
+    try:
+        queue.submit("first")
+        second = queue.submit("second")
+        deadline = time.time() + 5
+        while queue.get(second)["status"] != "succeeded" and time.time() < deadline:
+            time.sleep(0.05)
+        assert queue.get(second)["status"] == "succeeded"
+        assert queue._threads[0].is_alive()
+    finally:
+        queue.stop()
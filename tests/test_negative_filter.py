@@ -0,0 +1,90 @@
+"""Tests for the persistent negative lookup filter"""
+
+import fcntl
+import os
+import threading
+
+from services import negative_filter
+from services.negative_filter import NegativeLookupFilter
+
+
+def test_membership_is_normalized():
+    negatives = NegativeLookupFilter(capacity=1000, error_rate=0.01)
+    negatives.add("InvalidCity123")
+
+    assert negatives.contains("  invalidcity123 ")
+    assert not negatives.contains("Bangalore")
+
+
+def test_concurrent_writers_merge_on_save(tmp_path):
+    path = str(tmp_path / "negative.bloom")
+    first = NegativeLookupFilter(path, capacity=1000, error_rate=0.01)
+    second = NegativeLookupFilter(path, capacity=1000, error_rate=0.01)
+
+    first.add("Atlantis")
+    second.add("El Dorado")
+    first.save()
+    second.save()
+
+    reloaded = NegativeLookupFilter(path, capacity=1000, error_rate=0.01)
+    assert reloaded.contains("Atlantis")
+    assert reloaded.contains("El Dorado")
+    # The later writer also picked up the earlier one's entries
+    assert second.contains("Atlantis")
+
+
+def test_entries_expire_after_two_generations(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(negative_filter.time, "time", lambda: now[0])
+    negatives = NegativeLookupFilter(capacity=1000, error_rate=0.01, max_age=100)
+    negatives.add("Atlantis")
+
+    now[0] += 100
+    assert negatives.contains("Atlantis")
+
+    now[0] += 100
+    assert not negatives.contains("Atlantis")
+
+
+def test_full_generation_stops_taking_entries():
+    negatives = NegativeLookupFilter(capacity=10, error_rate=0.01)
+    for i in range(10):
+        negatives.add(f"junk-{i}")
+    negatives.add("one-too-many")
+
+    assert negatives.contains("junk-0")
+    assert not negatives.contains("one-too-many")
+
+
+def test_parameter_change_ignores_saved_filter(tmp_path):
+    path = str(tmp_path / "negative.bloom")
+    negatives = NegativeLookupFilter(path, capacity=1000, error_rate=0.01)
+    negatives.add("Atlantis")
+    negatives.save()
+
+    resized = NegativeLookupFilter(path, capacity=5000, error_rate=0.01)
+    assert not resized.contains("Atlantis")
+
+
+def test_add_saves_in_the_background(tmp_path):
+    path = str(tmp_path / "negative.bloom")
+    negatives = NegativeLookupFilter(path, capacity=1000, error_rate=0.01)
+    negatives.SAVE_INTERVAL = 0.05
+    saved = threading.Event()
+    real_save = negatives.save
+
+    def save():
+        real_save()
+        saved.set()
+
+    negatives.save = save
+
+    # Another process holds the file lock; add() must not wait for it
+    with open(f"{path}.lock", "a+b") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        negatives.add("Atlantis")
+        assert negatives.contains("Atlantis")
+        assert not os.path.exists(path)
+
+    assert saved.wait(5)
+    assert NegativeLookupFilter(path, capacity=1000, error_rate=0.01).contains("Atlantis")
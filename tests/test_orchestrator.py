@@ -0,0 +1,105 @@
+"""Tests for the orchestrator's answer cache"""
+
+import pytest
+from langchain.tools import Tool
+from langchain_core.agents import AgentAction
+
+from agents.orchestrator import TourismOrchestrator
+from services.cache import create_cache
+from services.negative_filter import NegativeLookupFilter
+
+
+class StubExecutor:
+    """Stands in for AgentExecutor, returning a canned result"""
+
+    max_iterations = 5
+
+    def __init__(self, output, steps=()):
+        self.result = {"output": output, "intermediate_steps": list(steps)}
+        self.calls = 0
+
+    def invoke(self, inputs, config=None):
+        self.calls += 1
+        return self.result
+
+
+def step(observation, tool="WeatherAgent", place="Bangalore"):
+    return AgentAction(tool, place, ""), observation
+
+
+@pytest.fixture
+def negatives():
+    return NegativeLookupFilter(capacity=1000, error_rate=0.01)
+
+
+@pytest.fixture
+def make_orchestrator(negatives):
+    tools = [
+        Tool(name="WeatherAgent", func=lambda place: "", description="weather"),
+        Tool(name="PlacesAgent", func=lambda place: "", description="places")
+    ]
+
+    def make(output, steps=()):
+        orchestrator = TourismOrchestrator(
+            tools, verbose=False, cache=create_cache("memory"),
+            negative_filter=negatives, api_key="test"
+        )
+        orchestrator.agent_executor = StubExecutor(output, steps)
+        return orchestrator
+
+    return make
+
+
+def test_final_answer_is_cached(make_orchestrator):
+    orchestrator = make_orchestrator(
+        "In Bangalore it's currently 24°C.",
+        [step("In Bangalore it's currently 24°C with a chance of 35% to rain.")]
+    )
+
+    first = orchestrator.process_query("Weather in Bangalore?")
+    second = orchestrator.process_query("weather in  bangalore?")
+
+    assert first["max_age"] == TourismOrchestrator.ANSWER_CACHE_TTL
+    assert second["output"] == first["output"]
+    assert orchestrator.agent_executor.calls == 1
+
+
+@pytest.mark.parametrize("output, steps", [
+    ("Agent stopped due to iteration limit or time limit.", [step("In Bangalore ...")] * 5),
+    ("Sorry, the weather is unavailable.", [step("Could not retrieve weather data for Bangalore")]),
+    ("No places to suggest.", [step("No tourist attractions found in Bangalore", tool="PlacesAgent")]),
+    ("In Bangalore it's 24°C.", [step("Invalid or incomplete response", tool="_Exception"), step("In Bangalore ...")]),
+    ("I don't know this place exists", [step("I don't know this place exists: Bangalore")])
+])
+def test_failed_or_incomplete_answers_are_not_cached(make_orchestrator, output, steps):
+    orchestrator = make_orchestrator(output, steps)
+
+    first = orchestrator.process_query("Weather in Bangalore?")
+    orchestrator.process_query("Weather in Bangalore?")
+
+    assert first["max_age"] == 0
+    assert orchestrator.agent_executor.calls == 2
+
+
+def test_definitive_unknown_place_is_cached(make_orchestrator, negatives):
+    negatives.add("InvalidCity123")
+    orchestrator = make_orchestrator(
+        "I don't know this place exists",
+        [step("I don't know this place exists: InvalidCity123", place="InvalidCity123")]
+    )
+
+    result = orchestrator.process_query("I'm going to InvalidCity123")
+
+    assert result["max_age"] == TourismOrchestrator.ANSWER_CACHE_TTL
+    assert negatives.contains("query:i'm going to invalidcity123")
+
+
+def test_agent_llm_calls_go_through_the_cache():
+    # A streaming agent would call the model via .stream(), which skips the LLM cache
+    orchestrator = TourismOrchestrator(
+        [Tool(name="WeatherAgent", func=lambda place: "", description="weather")],
+        verbose=False, cache=create_cache("memory"), api_key="test"
+    )
+
+    assert orchestrator.agent_executor.agent.stream_runnable is False
+    assert orchestrator.llm.cache is not None
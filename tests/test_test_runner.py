@@ -0,0 +1,152 @@
+"""Tests for the assignment test runner and fixture record/replay"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents.test_runner import build_fixture_orchestrator, run_case, run_test_cases
+from services import metrics
+from services.geocoding import GeocodingService
+from services.weather import WeatherService
+
+QUERY = "I'm going to go to Bangalore, what is the temperature there"
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """Plays Nominatim, Open-Meteo and the OpenAI chat completions API"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.hits[self.path.split("?")[0]] += 1
+        if self.path.startswith("/search"):
+            self.reply([{"lat": "12.97", "lon": "77.59", "display_name": "Bengaluru, Karnataka, India"}])
+        elif self.path.startswith("/forecast"):
+            self.reply({
+                "current_weather": {"temperature": 24.0, "windspeed": 5.0, "weathercode": 1},
+                "hourly": {"precipitation_probability": [35]}
+            })
+        else:
+            self.reply({}, status=404)
+
+    def do_POST(self):
+        self.server.hits[self.path] += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        if "\nObservation: In " in prompt:
+            content = "I now know the final answer\nFinal Answer: In Bangalore it's currently 24°C."
+        else:
+            content = "I should check the weather.\nAction: WeatherAgent\nAction Input: Bangalore"
+        if body.get("stream"):
+            # The ReAct agent streams its completions
+            chunk = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"role": "assistant", "content": content}, "finish_reason": "stop"}]
+            }
+            self.reply_raw(f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode("utf-8"), "text/event-stream")
+            return
+        self.reply({
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        })
+
+    def reply(self, payload, status=200):
+        self.reply_raw(json.dumps(payload).encode("utf-8"), "application/json", status)
+
+    def reply_raw(self, data, content_type, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+    httpd.daemon_threads = True
+    httpd.hits = Counter()
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    monkeypatch.setattr(GeocodingService, "BASE_URL", f"{url}/search")
+    monkeypatch.setattr(WeatherService, "BASE_URL", f"{url}/forecast")
+    monkeypatch.setattr(GeocodingService, "MIN_INTERVAL", 0)
+    monkeypatch.setenv("OPENAI_API_BASE", f"{url}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("GAZETTEER_PATH", "off")
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_record_then_replay(upstream, tmp_path):
+    fixtures_path = str(tmp_path / "fixtures" / "cases.sqlite3")
+
+    recorded = run_case(build_fixture_orchestrator("record", fixtures_path), QUERY)
+    assert recorded["success"], recorded
+    assert "24°C" in recorded["response"]
+    assert upstream.hits["/search"] == 1
+    assert upstream.hits["/forecast"] == 1
+    assert upstream.hits["/v1/chat/completions"] == 2
+
+    hits_after_recording = dict(upstream.hits)
+    replayed = run_case(build_fixture_orchestrator("replay", fixtures_path), QUERY)
+
+    assert replayed["success"], replayed
+    assert replayed["response"] == recorded["response"]
+    assert dict(upstream.hits) == hits_after_recording
+    assert replayed["timings"]["fixture_hits"] == 2
+    # Reads of the fixture store aren't cache hits
+    assert "cache_hits" not in replayed["timings"]
+
+
+def test_replay_requires_recorded_fixtures(tmp_path):
+    with pytest.raises(FileNotFoundError, match="--record"):
+        build_fixture_orchestrator("replay", str(tmp_path / "missing.sqlite3"))
+
+
+class StubOrchestrator:
+    """Records metrics that identify the query, interleaved across threads"""
+
+    def __init__(self, workers):
+        self.barrier = threading.Barrier(workers)
+
+    def process_query(self, query):
+        n = int(query.split()[-1])
+        self.barrier.wait(5)  # make sure every case is in flight at once
+        for _ in range(n):
+            metrics.incr("http_requests")
+            time.sleep(0.001)
+        metrics.record_time("tool", n / 100)
+        if n == 3:
+            raise RuntimeError("upstream down")
+        return {"success": True, "output": f"answer {n}"}
+
+
+def test_concurrent_cases_keep_separate_timings():
+    queries = [f"case {n}" for n in (1, 2, 3, 4)]
+
+    results = run_test_cases(StubOrchestrator(len(queries)), queries, parallelism=4)
+
+    assert [r["query"] for r in results] == queries
+    for n, result in zip((1, 2, 3, 4), results):
+        assert result["timings"]["http_requests"] == n
+        assert result["timings"]["tool_ms"] == n * 10
+        assert result["response_time"] >= 0
+    assert results[2]["success"] is False and results[2]["error"] == "upstream down"
+    assert results[3]["response"] == "answer 4"
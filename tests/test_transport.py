@@ -0,0 +1,118 @@
+"""Tests for the shared HTTP transport against a local server"""
+
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from services.transport import CappedRetry, TransportStats, create_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_GET(self):
+        hits = self.server.hits
+        with self.server.lock:
+            hits[self.path] += 1
+            count = hits[self.path]
+
+        if self.path == "/slow":
+            time.sleep(0.5)
+            self.reply(200, b"late")
+        elif self.path == "/flaky" and count <= 2:
+            self.reply(503, b"unavailable")
+        elif self.path == "/broken":
+            self.reply(500, b"error")
+        elif self.path == "/throttled" and count == 1:
+            self.reply(429, b"slow down", {"Retry-After": "30"})
+        else:
+            self.reply(200, b'{"ok": true}')
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.hits = Counter()
+    httpd.lock = threading.Lock()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def session(server):
+    return create_session(server.url, retries=3, backoff_factor=0, stats=TransportStats(), max_retry_after=0.2)
+
+
+def test_read_timeouts_are_not_retried(server, session):
+    # With read=0, urllib3 gives up at once and requests reports it as a ConnectionError
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"{server.url}/slow", timeout=0.2)
+    time.sleep(0.5)
+    assert server.hits["/slow"] == 1
+
+
+def test_unavailable_is_retried(server, session):
+    response = session.get(f"{server.url}/flaky", timeout=5)
+
+    assert response.status_code == 200
+    assert server.hits["/flaky"] == 3
+
+
+def test_server_errors_are_not_retried(server, session):
+    response = session.get(f"{server.url}/broken", timeout=5)
+
+    assert response.status_code == 500
+    assert server.hits["/broken"] == 1
+
+
+def test_retry_after_is_capped(server, session):
+    start = time.monotonic()
+    response = session.get(f"{server.url}/throttled", timeout=5)
+
+    assert response.status_code == 200
+    assert server.hits["/throttled"] == 2
+    assert time.monotonic() - start < 5
+
+
+def test_capped_retry_survives_new():
+    retry = CappedRetry(total=3, max_retry_after=7).new(total=2)
+
+    assert isinstance(retry, CappedRetry)
+    assert retry.max_retry_after == 7
+
+
+def test_connection_reuse_is_counted(server):
+    stats = TransportStats()
+    session = create_session(server.url, stats=stats)
+    for _ in range(3):
+        assert session.get(f"{server.url}/ok", timeout=5).status_code == 200
+
+    host = stats.snapshot()["hosts"]["127.0.0.1"]
+    assert host["requests"] == 3
+    assert host["connections_opened"] == 1
+    assert host["connections_reused"] == 2
+    assert host["bytes_decoded"] == 3 * len(b'{"ok": true}')